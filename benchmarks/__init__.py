@@ -0,0 +1 @@
+"""Performance measurements of Note Save, run without the GUI"""
@@ -0,0 +1,76 @@
+"""Benchmark of the image storage profiles: encoding and decoding time and size"""
+
+from io import BytesIO
+from os import listdir, path
+from sys import argv
+from time import perf_counter
+
+from PIL import Image
+
+from benchmarks.images import generate_screenshot
+from note_save.configuration import IMAGE_PROFILES
+
+SYNTHETIC_IMAGES = 8
+
+
+def load_corpus(folder=None):
+    """Return the images of a folder or synthetic screenshots"""
+    if folder is None:
+        return [generate_screenshot(seed=seed) for seed in range(SYNTHETIC_IMAGES)]
+    images = []
+    for file_name in sorted(listdir(folder)):
+        try:
+            with Image.open(path.join(folder, file_name)) as image:
+                image.load()
+                images.append(image)
+        except (Image.UnidentifiedImageError, OSError):
+            continue
+    return images
+
+
+def bench_profile(images, profile):
+    """Return the encoding time, decoding time and bytes of a profile for the images"""
+    _, image_format, options = IMAGE_PROFILES[profile]
+    encode_time = 0
+    decode_time = 0
+    size = 0
+    for image in images:
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        encoded = BytesIO()
+        start = perf_counter()
+        image.save(encoded, image_format, **options)
+        encode_time += perf_counter() - start
+        size += encoded.tell()
+
+        encoded.seek(0)
+        start = perf_counter()
+        with Image.open(encoded) as decoded:
+            decoded.load()
+        decode_time += perf_counter() - start
+    return encode_time, decode_time, size
+
+
+def run(folder=None):
+    """Run the profile benchmarks and return the results by image"""
+    images = load_corpus(folder)
+    results = {}
+    for profile in IMAGE_PROFILES:
+        encode_time, decode_time, size = bench_profile(images, profile)
+        results[f"codec_{profile}_encode"] = encode_time / len(images)
+        results[f"codec_{profile}_decode"] = decode_time / len(images)
+        results[f"codec_{profile}_bytes"] = size / len(images)
+    return results
+
+
+if __name__ == "__main__":
+    corpus_results = run(argv[1] if len(argv) > 1 else None)
+    print(f"{'profile':<15}{'encode ms':>12}{'decode ms':>12}{'KiB':>10}")
+    for profile_name in IMAGE_PROFILES:
+        print(
+            f"{profile_name:<15}"
+            f"{corpus_results[f'codec_{profile_name}_encode'] * 1000:>12.1f}"
+            f"{corpus_results[f'codec_{profile_name}_decode'] * 1000:>12.1f}"
+            f"{corpus_results[f'codec_{profile_name}_bytes'] / 1024:>10.1f}"
+        )
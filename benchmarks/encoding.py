@@ -0,0 +1,45 @@
+"""Benchmark of the image encoding of save(), sequential and in parallel"""
+
+from os import cpu_count
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.images import generate_screenshot
+from note_save.encoding import encode_images, get_encoding_pool
+
+BATCH_SIZES = [1, 8, 64]
+
+
+def bench_batch(images, parallel):
+    """Return the time to encode a batch of images"""
+    with TemporaryDirectory() as folder:
+        encodings = [
+            (image, f"{folder}/{index}.png") for index, image in enumerate(images)
+        ]
+        start = perf_counter()
+        # A batch is never encoded in parallel with an infinite minimum
+        encode_images(encodings, parallel_min_images=1 if parallel else float("inf"))
+        return perf_counter() - start
+
+
+def run():
+    """Run the encoding benchmarks and return the results in images by second"""
+    # Start the processes before measuring
+    get_encoding_pool().submit(int).result()
+
+    results = {}
+    images = [generate_screenshot(seed=seed) for seed in range(max(BATCH_SIZES))]
+    for batch_size in BATCH_SIZES:
+        batch = images[:batch_size]
+        for parallel in (False, True):
+            mode = "parallel" if parallel else "sequential"
+            results[f"encoding_{mode}_{batch_size}"] = batch_size / bench_batch(
+                batch, parallel
+            )
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{cpu_count()} CPUs")
+    for name, images_by_second in run().items():
+        print(f"{name}: {images_by_second:.1f} images/s")
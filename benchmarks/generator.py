@@ -0,0 +1,138 @@
+"""Synthetic save folders with collections of texts and images
+
+python -m benchmarks.generator FOLDER [--collections 3] [--entries 1000]
+"""
+
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from io import BytesIO
+from os import chdir, getcwd, makedirs
+from random import Random
+
+from benchmarks.images import generate_screenshot
+from note_save.configuration import IMAGE_EXTENSION, SAVE_FOLDER
+from note_save.storage import FileStorage
+
+# Number of characters of the texts, mostly short notes
+TEXT_SIZES = (20, 20, 80, 80, 80, 400, 2_000)
+# Number of images of the entries, mostly texts and small groups of images
+IMAGE_COUNTS = (0, 0, 0, 1, 1, 2, 3, 12)
+IMAGE_SIZE = (640, 360)
+# Distinct images written, the other images are copies of them
+DISTINCT_IMAGES = 8
+START_TIME = datetime(2024, 1, 1)
+
+WORDS = (
+    "note image meeting idea todo link screenshot error python save page "
+    "collection review draft bug fix release plan test design"
+).split()
+
+
+@contextmanager
+def working_directory(folder):
+    """Run the code of the context in another working directory"""
+    previous_folder = getcwd()
+    chdir(folder)
+    try:
+        yield
+    finally:
+        chdir(previous_folder)
+
+
+def generate_text(random, size):
+    """Return a text of about size characters"""
+    words = []
+    length = 0
+    while length < size:
+        words.append(random.choice(WORDS))
+        length += len(words[-1]) + 1
+        if random.random() < 0.1:
+            words.append("\n")
+    return " ".join(words).strip()
+
+
+def encode_images(image_size=IMAGE_SIZE):
+    """Return the encoded files of the distinct images"""
+    encoded_images = []
+    for seed in range(DISTINCT_IMAGES):
+        encoded = BytesIO()
+        generate_screenshot(*image_size, seed=seed).save(encoded, "PNG")
+        encoded_images.append(encoded.getvalue())
+    return encoded_images
+
+
+def write_images(collection, time, encoded_images):
+    """Write the image files of an entry saved at a time, return their names"""
+    image_names = []
+    for index, encoded_image in enumerate(encoded_images):
+        image_name = f"{time}_{index}" if index > 0 else time
+        with open(
+            f"{SAVE_FOLDER}/{collection}/{image_name}{IMAGE_EXTENSION}", "wb"
+        ) as image_file:
+            image_file.write(encoded_image)
+        image_names.append(image_name)
+    return image_names
+
+
+def generate_saved_tree(
+    folder,
+    collections=3,
+    entries=1_000,
+    text_sizes=TEXT_SIZES,
+    image_counts=IMAGE_COUNTS,
+    image_size=IMAGE_SIZE,
+    seed=0,
+):
+    """Create a save folder in a folder and return the names of its collections
+
+    The sizes of the texts and numbers of images are picked in the given
+    sequences, repeat a value to make it more frequent.
+    """
+    random = Random(seed)
+    encoded_images = encode_images(image_size)
+    storage = FileStorage()
+    collection_names = [f"collection_{index}" for index in range(collections)]
+
+    makedirs(folder, exist_ok=True)
+    with working_directory(folder):
+        for collection in collection_names:
+            makedirs(f"{SAVE_FOLDER}/{collection}", exist_ok=True)
+            for entry_index in range(entries):
+                # Names in the format of save, one second by entry
+                time = (START_TIME + timedelta(seconds=entry_index)).strftime(
+                    "%Y-%m-%d_%H-%M-%S"
+                )
+                image_names = write_images(
+                    collection,
+                    time,
+                    [
+                        encoded_images[random.randrange(len(encoded_images))]
+                        for _ in range(random.choice(image_counts))
+                    ],
+                )
+                storage.append(
+                    collection,
+                    image_names,
+                    generate_text(random, random.choice(text_sizes)),
+                )
+    return collection_names
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        prog="python -m benchmarks.generator",
+        description="Create a synthetic save folder.",
+    )
+    parser.add_argument("folder", help="folder where the save folder is created")
+    parser.add_argument("--collections", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    names = generate_saved_tree(
+        arguments.folder,
+        collections=arguments.collections,
+        entries=arguments.entries,
+        seed=arguments.seed,
+    )
+    print(f"{len(names)} collections of {arguments.entries} entries created.")
@@ -0,0 +1,34 @@
+"""Synthetic images looking like screenshots"""
+
+from random import Random
+
+from PIL import Image, ImageDraw
+
+
+def generate_screenshot(width=1920, height=1080, seed=0):
+    """Return an image with flat areas, borders and text-like lines"""
+    random = Random(seed)
+    image = Image.new("RGB", (width, height), (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+
+    # Windows and panels
+    for _ in range(12):
+        left = random.randrange(0, width - 100)
+        top = random.randrange(0, height - 100)
+        right = random.randrange(left + 50, min(width, left + width // 2))
+        bottom = random.randrange(top + 50, min(height, top + height // 2))
+        color = tuple(random.randrange(150, 256) for _ in range(3))
+        draw.rectangle((left, top, right, bottom), fill=color, outline=(60, 60, 60))
+
+    # Lines of text
+    for _ in range(height // 12):
+        left = random.randrange(0, width - 200)
+        top = random.randrange(0, height - 10)
+        for _ in range(random.randrange(5, 40)):
+            word_width = random.randrange(8, 40)
+            draw.rectangle((left, top, left + word_width, top + 6), fill=(30, 30, 30))
+            left += word_width + 6
+            if left > width - 50:
+                break
+
+    return image
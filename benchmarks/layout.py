@@ -0,0 +1,56 @@
+"""Benchmark of the placement of the entries in pages"""
+
+from random import Random
+from time import perf_counter
+
+from note_save.layout import PageLayout
+
+ENTRY_COUNTS = [1_000, 10_000, 100_000]
+
+
+def generate_image_counts(entry_count, seed=0):
+    """Return random numbers of images, mostly texts and small groups of images"""
+    random = Random(seed)
+    return [random.choice((0, 0, 0, 1, 1, 2, 3, 12)) for _ in range(entry_count)]
+
+
+def bench_build(image_counts):
+    """Return the time to place all the entries"""
+    start = perf_counter()
+    layout = PageLayout()
+    layout.extend(image_counts)
+    return perf_counter() - start, layout
+
+
+def bench_lookup(layout):
+    """Return the time to find the range and positions of the entries of every page"""
+    start = perf_counter()
+    for page in range(layout.page_count()):
+        starting_index, ending_index = layout.page_range(page)
+        for index in range(starting_index, ending_index):
+            layout.position(index)
+    return perf_counter() - start
+
+
+def bench_append(layout, count=1_000):
+    """Return the mean time to add an entry to an existing layout"""
+    start = perf_counter()
+    for _ in range(count):
+        layout.append(1)
+    return (perf_counter() - start) / count
+
+
+def run():
+    """Run the layout benchmarks and return the results in seconds"""
+    results = {}
+    for entry_count in ENTRY_COUNTS:
+        build_time, layout = bench_build(generate_image_counts(entry_count))
+        results[f"layout_build_{entry_count}"] = build_time
+        results[f"layout_lookup_{entry_count}"] = bench_lookup(layout)
+        results[f"layout_append_{entry_count}"] = bench_append(layout)
+    return results
+
+
+if __name__ == "__main__":
+    for name, seconds in run().items():
+        print(f"{name}: {seconds * 1000:.3f} ms")
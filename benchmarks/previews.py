@@ -0,0 +1,53 @@
+"""Benchmark of the preview latency by image, full decoding against the fast path"""
+
+from io import BytesIO
+from time import perf_counter
+
+from PIL import Image
+
+from benchmarks.images import generate_screenshot
+from note_save.preview import RESAMPLING, get_preview_size, make_preview
+
+IMAGE_COUNT = 8
+FORMATS = ["PNG", "JPEG"]
+
+
+def full_preview(image):
+    """Preview as computed before the fast path, resampling the full image"""
+    return image.resize(get_preview_size(image.width, image.height), RESAMPLING)
+
+
+def bench_format(images, image_format, preview_function):
+    """Return the mean time to open an encoded image and compute its preview"""
+    encoded_images = []
+    for image in images:
+        encoded = BytesIO()
+        image.save(encoded, image_format)
+        encoded_images.append(encoded.getvalue())
+
+    start = perf_counter()
+    for encoded in encoded_images:
+        with Image.open(BytesIO(encoded)) as opened_image:
+            preview_function(opened_image)
+    return (perf_counter() - start) / len(encoded_images)
+
+
+def run():
+    """Run the preview benchmarks and return the results in seconds by image"""
+    images = [generate_screenshot(seed=seed) for seed in range(IMAGE_COUNT)]
+    results = {}
+    for image_format in FORMATS:
+        results[f"preview_full_{image_format.lower()}"] = bench_format(
+            images, image_format, full_preview
+        )
+        results[f"preview_fast_{image_format.lower()}"] = bench_format(
+            images,
+            image_format,
+            lambda image: make_preview(image, opened_for_preview=True),
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for name, seconds in run().items():
+        print(f"{name}: {seconds * 1000:.1f} ms")
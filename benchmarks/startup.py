@@ -0,0 +1,151 @@
+"""Benchmark of the startup time of the command line interface and of the window"""
+
+import sys
+from json import loads
+from os import environ, path
+from subprocess import run as run_process
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.generator import generate_saved_tree
+
+REPEAT = 5
+# The commands are run in a save folder, note_save is imported from the project
+PROJECT_FOLDER = path.dirname(path.dirname(path.abspath(__file__)))
+COMMANDS = {
+    "startup_list_collections": ["list-collections"],
+    "startup_stats": ["stats"],
+    "startup_page": ["page", "collection_0", "1"],
+}
+# Modules of the GUI which should not be imported by the commands
+GUI_MODULES = ("tkinter", "PIL", "note_save.app")
+# Seconds given to the background threads to import their modules
+SETTLE_TIME = 0.5
+
+
+def bench_command(arguments, folder):
+    """Return the best time to run a command in a new Python process"""
+    times = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        run_process(
+            [sys.executable, "-m", "note_save", *arguments],
+            cwd=folder,
+            env={**environ, "PYTHONPATH": PROJECT_FOLDER},
+            check=True,
+            capture_output=True,
+        )
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def get_imported_gui_modules():
+    """Return the GUI modules imported with the command line interface"""
+    code = (
+        "import sys, note_save.cli; "
+        f"print(' '.join(m for m in {GUI_MODULES!r} if m in sys.modules))"
+    )
+    return run_process(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.split()
+
+
+def get_writer_imported_modules():
+    """Return the modules of the images imported by the save writer before a save"""
+    code = (
+        "import sys, time; from note_save.save_queue import SaveQueue; "
+        f"SaveQueue(1, None, None); time.sleep({SETTLE_TIME}); "
+        "print(' '.join(m for m in ('PIL', 'note_save.save') if m in sys.modules))"
+    )
+    return run_process(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.split()
+
+
+def bench_command_line(command):
+    """Return the time to run a command line"""
+    start = perf_counter()
+    run_process(command, check=True, capture_output=True)
+    return perf_counter() - start
+
+
+# Run in a new process: time to import the GUI and to reach the first idle
+# iteration of the main loop, when the window is displayed, the modules are
+# checked a little later to include the ones of the background threads
+GUI_STARTUP_CODE = f"""
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+from note_save.app import App
+imported = time.perf_counter()
+root = tk.Tk()
+app = App(root)
+def idle():
+    first_idle = time.perf_counter() - start
+    time.sleep({SETTLE_TIME})
+    print(json.dumps({{
+        "import": imported - start,
+        "first_idle": first_idle,
+        "pil_imported": "PIL" in sys.modules,
+        "explorer_imported": "note_save.gui_explorer" in sys.modules,
+    }}))
+    app.quit()
+root.after_idle(idle)
+root.mainloop()
+"""
+
+
+def bench_gui(folder):
+    """Return the best startup times of the window, None without a display"""
+    measures = []
+    for _ in range(REPEAT):
+        process = run_process(
+            [sys.executable, "-c", GUI_STARTUP_CODE],
+            cwd=folder,
+            env={**environ, "PYTHONPATH": PROJECT_FOLDER},
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            return None
+        measures.append(loads(process.stdout.splitlines()[-1]))
+    return {
+        "startup_gui_import": min(measure["import"] for measure in measures),
+        "startup_gui_first_idle": min(measure["first_idle"] for measure in measures),
+        "pil_imported": measures[-1]["pil_imported"],
+        "explorer_imported": measures[-1]["explorer_imported"],
+    }
+
+
+def run():
+    """Run the startup benchmarks and return the results in seconds"""
+    results = {}
+    with TemporaryDirectory() as folder:
+        generate_saved_tree(folder, collections=2, entries=200, image_counts=(0,))
+        results["startup_python"] = min(
+            bench_command_line([sys.executable, "-c", "pass"]) for _ in range(REPEAT)
+        )
+        for name, arguments in COMMANDS.items():
+            results[name] = bench_command(arguments, folder)
+
+        gui_results = bench_gui(folder)
+        if gui_results is None:
+            print("The window cannot be opened, its startup is not measured.")
+        else:
+            for name in ("pil_imported", "explorer_imported"):
+                if gui_results.pop(name):
+                    print(f"Loaded before the first display: {name}")
+            results.update(gui_results)
+    return results
+
+
+if __name__ == "__main__":
+    gui_modules = get_imported_gui_modules()
+    if len(gui_modules) > 0:
+        print(f"GUI modules imported by the commands: {', '.join(gui_modules)}")
+    writer_modules = get_writer_imported_modules()
+    if len(writer_modules) > 0:
+        print(f"Modules imported by the save writer: {', '.join(writer_modules)}")
+    for benchmark_name, result in run().items():
+        print(f"{benchmark_name}: {result * 1000:.1f} ms")
@@ -0,0 +1,222 @@
+"""Benchmarks of the main operations on a synthetic save folder, with baselines
+
+python -m benchmarks.suite run [--output results.json] [--save-baseline]
+python -m benchmarks.suite compare results.json [--baseline benchmarks/baseline.json]
+
+All the results are times in seconds, lower is better.
+"""
+
+from argparse import ArgumentParser
+from json import dump
+from json import load as load_json
+from os import listdir, makedirs, path
+from platform import platform, python_version
+from sys import exit as sys_exit
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.generator import generate_saved_tree, working_directory
+from benchmarks.images import generate_screenshot
+from note_save.configuration import IMAGE_EXTENSION, SAVE_FOLDER
+from note_save.layout import PageLayout
+from note_save.load import get_image_path, load
+from note_save.save import get_time, name_image, name_images, save
+from note_save.storage import get_storage
+from note_save.thumbnails import create_thumbnail, get_thumbnail
+
+BASELINE_PATH = path.join(path.dirname(__file__), "baseline.json")
+# Best time of several runs, the others are slowed down by the system
+REPEAT = 3
+# Relative slowdown reported as a regression
+THRESHOLD = 0.2
+
+SAVED_ENTRIES = 50
+BURST_SIZE = 200
+THUMBNAIL_COUNT = 20
+
+
+def measure(function, *args, repeat=REPEAT):
+    """Return the best time of several calls of a function"""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function(*args)
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def paginate(collection):
+    """Place the entries of a collection in pages and load every page"""
+    storage = get_storage()
+    layout = PageLayout()
+    layout.extend(storage.image_counts(collection))
+    for page in range(layout.page_count()):
+        storage.page(collection, *layout.page_range(page))
+
+
+def save_entries(collection, images):
+    """Save texts, alone or with an image"""
+    for index in range(SAVED_ENTRIES):
+        save(collection, f"Saved entry {index}", images[index % 2 : index % 2 + 1])
+
+
+def bench_name_burst(folder):
+    """Return the times to name an image after a burst of images in the same second"""
+    time = get_time()
+    makedirs(folder, exist_ok=True)
+    for index in range(BURST_SIZE):
+        image_name = f"{time}_{index}" if index > 0 else time
+        with open(f"{folder}/{image_name}{IMAGE_EXTENSION}", "wb"):
+            pass
+    return {
+        "name_image_burst": measure(name_image, folder),
+        "name_images_burst": measure(name_images, folder, 1),
+    }
+
+
+def bench_thumbnails(collection):
+    """Return the mean times to create a thumbnail and to read it from the cache"""
+    image_paths = [
+        get_image_path(collection, file_name[: -len(IMAGE_EXTENSION)])
+        for file_name in sorted(listdir(f"{SAVE_FOLDER}/{collection}"))
+        if file_name.endswith(IMAGE_EXTENSION)
+    ][:THUMBNAIL_COUNT]
+    if len(image_paths) == 0:
+        return {}
+
+    start = perf_counter()
+    for image_path in image_paths:
+        create_thumbnail(collection, image_path)
+    created = perf_counter() - start
+
+    start = perf_counter()
+    for image_path in image_paths:
+        get_thumbnail(collection, image_path)
+    cached = perf_counter() - start
+
+    return {
+        "thumbnail_create": created / len(image_paths),
+        "thumbnail_cached": cached / len(image_paths),
+    }
+
+
+def run(collections=1, entries=5_000):
+    """Run the benchmarks in a temporary save folder and return the results"""
+    results = {}
+    with TemporaryDirectory() as folder:
+        collection = generate_saved_tree(folder, collections, entries)[0]
+        images = [generate_screenshot(seed=seed) for seed in range(2)]
+        with working_directory(folder):
+            results["load_full"] = measure(load, collection)
+            results["paginate_all_pages"] = measure(paginate, collection)
+            results["save_entry"] = (
+                measure(save_entries, "saved_entries", images, repeat=1) / SAVED_ENTRIES
+            )
+            results.update(bench_name_burst(f"{SAVE_FOLDER}/burst"))
+            results.update(bench_thumbnails(collection))
+    return results
+
+
+def write_results(results, file, parameters):
+    """Write the results with a description of the machine to a JSON file"""
+    with open(file, "w", encoding="utf8") as opened_file:
+        dump(
+            {
+                "python": python_version(),
+                "platform": platform(),
+                "parameters": parameters,
+                "results": results,
+            },
+            opened_file,
+            indent=2,
+        )
+
+
+def read_results(file):
+    """Return the results of a JSON file"""
+    with open(file, "r", encoding="utf8") as opened_file:
+        return load_json(opened_file)["results"]
+
+
+def compare(baseline, results, threshold=THRESHOLD):
+    """Return the (name, baseline, result) of the results slower than the baseline"""
+    return [
+        (name, baseline[name], result)
+        for name, result in results.items()
+        if name in baseline and result > baseline[name] * (1 + threshold)
+    ]
+
+
+def print_comparison(baseline, results, threshold=THRESHOLD):
+    """Print the results next to the baseline, return True if there is a regression"""
+    regressions = {name for name, _, _ in compare(baseline, results, threshold)}
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name}: {result * 1000:.3f} ms (new)")
+            continue
+        change = result / baseline[name] - 1 if baseline[name] > 0 else 0
+        flag = "  REGRESSION" if name in regressions else ""
+        print(
+            f"{name}: {result * 1000:.3f} ms, baseline {baseline[name] * 1000:.3f} ms "
+            f"({change:+.0%}){flag}"
+        )
+    return len(regressions) > 0
+
+
+def main(arguments=None):
+    """Run the benchmarks or compare results from the command line arguments"""
+    parser = ArgumentParser(prog="python -m benchmarks.suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--collections", type=int, default=1)
+    run_parser.add_argument("--entries", type=int, default=5_000)
+    run_parser.add_argument("--output", help="JSON file of the results")
+    run_parser.add_argument(
+        "--save-baseline", action="store_true", help="store the results as baseline"
+    )
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare results to a baseline"
+    )
+    compare_parser.add_argument("results", help="JSON file of the results")
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH)
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == "run":
+        parameters = {
+            "collections": arguments.collections,
+            "entries": arguments.entries,
+        }
+        results = run(**parameters)
+        for name, result in results.items():
+            print(f"{name}: {result * 1000:.3f} ms")
+        if arguments.output is not None:
+            write_results(results, arguments.output, parameters)
+        if arguments.save_baseline:
+            write_results(results, BASELINE_PATH, parameters)
+        return 0
+
+    if not path.isfile(arguments.baseline):
+        # The baseline depends on the machine, it is not in the repository
+        print(
+            f"No baseline in {arguments.baseline}, "
+            "create it with: python -m benchmarks.suite run --save-baseline"
+        )
+        return 2
+    if not path.isfile(arguments.results):
+        print(f"No results in {arguments.results}.")
+        return 2
+
+    regression = print_comparison(
+        read_results(arguments.baseline),
+        read_results(arguments.results),
+        arguments.threshold,
+    )
+    return 1 if regression else 0
+
+
+if __name__ == "__main__":
+    sys_exit(main())
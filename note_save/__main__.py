@@ -1,10 +1,24 @@
 """Entry point of the application"""
 
-import tkinter as tk
-
-from note_save.app import App
+import sys
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # The images are encoded by child processes, also in the built executable
+        from multiprocessing import freeze_support
+
+        freeze_support()
+
+    if len(sys.argv) > 1:
+        # Command line interface, without loading the GUI
+        from note_save.cli import main
+
+        sys.exit(main())
+
+    import tkinter as tk
+
+    from note_save.app import App
+
     root = tk.Tk()
 
     # GUI and events
@@ -1,11 +1,19 @@
 """GUI management and logic of the appplication"""
 
-from tkinter import TclError
+from tkinter import TclError, messagebox
 
-from .configuration import DEFAULT_COLLECTION_NAME
+from .configuration import (
+    BACKGROUND_WORKERS,
+    DEFAULT_COLLECTION_NAME,
+    SAVE_QUEUE_SIZE,
+)
 from .gui_banner import BannerFrame
-from .gui_explorer import ExplorerFrame
 from .gui_input import InputFrame
+from .render_queue import RenderQueue
+from .save_queue import SaveQueue
+from .scheduler import TaskScheduler
+from .storage import get_storage
+from .tracing import span
 from .ui import UI
 
 
@@ -24,16 +32,29 @@ class App:
 
         self.collection = DEFAULT_COLLECTION_NAME
 
+        # Shared workers for the background tasks (image loading, indexing...)
+        self.scheduler = TaskScheduler(BACKGROUND_WORKERS)
+        # Results of the background tasks displayed by the Tk thread
+        self.render_queue = RenderQueue(self.root)
+        # Saves are written in the background to keep the window responsive
+        self.save_queue = SaveQueue(
+            SAVE_QUEUE_SIZE, self.render_queue, self.event_saved
+        )
+        # Number of failed saves, the window is not closed after a failure
+        self.failed_saves = 0
+
         # Banner
         self.banner_gui = BannerFrame(self.root, self)
 
         # Input
         self.input_gui = InputFrame(self.root, self)
 
-        # Explorer
-        self.explorer_gui = ExplorerFrame(self.root, self)
+        # Explorer, created when it is opened for the first time
+        self.explorer_gui = None
 
         self.root.bind_all("<Escape>", self.event_escape)
+        # The close button also waits for the pending saves
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
 
         # Set the default UI to input
         self.change_ui(UI.INPUT)
@@ -55,20 +76,33 @@ class App:
             case UI.INPUT:
                 self.banner_gui.set_switch_ui_text("Explore")
                 self.input_gui.show()
-                self.explorer_gui.hide()
+                if self.explorer_gui is not None:
+                    self.explorer_gui.hide()
             case UI.EXPLORER:
                 self.banner_gui.set_switch_ui_text("Input")
                 self.input_gui.hide()
-                self.explorer_gui.show()
-                self.explorer_gui.full_refresh()
+                self.get_explorer_gui().show()
+                self.explorer_gui.update_refresh()
 
         self.resize()
 
+    def get_explorer_gui(self):
+        """Return the explorer, created on the first call"""
+        if self.explorer_gui is None:
+            # The explorer and PIL are not needed to open the window
+            from .gui_explorer import (  # pylint: disable=import-outside-toplevel
+                ExplorerFrame,
+            )
+
+            self.explorer_gui = ExplorerFrame(self.root, self)
+        return self.explorer_gui
+
     def resize(self):
         """Resize the window"""
         self.root.geometry("")
         self.root.minsize(0, 0)
-        self.root.update()
+        with span("root.update", "tk"):
+            self.root.update()
         self.root.minsize(self.root.winfo_width(), self.root.winfo_height())
 
     def get_ignore_events(self):
@@ -100,7 +134,28 @@ class App:
         """Set the current collection"""
         self.collection = collection
         self.input_gui.set_collection(self.collection)
-        self.explorer_gui.set_collection(self.collection)
+        if self.explorer_gui is not None:
+            self.explorer_gui.set_collection(self.collection)
+
+    def save(self, collection, text, images):
+        """Save the inputs in the background"""
+        self.save_queue.submit(collection, text, images)
+        self.banner_gui.set_pending_saves(self.save_queue.pending_count())
+
+    def event_saved(self, collection, text, images, saved, pending):
+        """A save is finished"""
+        self.banner_gui.set_pending_saves(pending)
+        if not saved:
+            self.failed_saves += 1
+            # Give the inputs back to be saved again
+            self.input_gui.restore_inputs(text, images)
+            messagebox.showerror(
+                title="Error",
+                message=f"Cannot save the inputs in the collection {collection}.",
+            )
+        elif collection == self.collection and self.explorer_gui is not None:
+            # Display the new entry if the explorer is opened
+            self.explorer_gui.update_refresh()
 
     def add_to_clipboard(self, content):
         """Add content to the clipboard"""
@@ -109,4 +164,18 @@ class App:
 
     def quit(self):
         """Exit the application"""
+        # Finish the pending saves before closing
+        if self.save_queue.pending_count() > 0:
+            self.banner_gui.set_pending_saves(self.save_queue.pending_count())
+            self.root.update_idletasks()
+        failed_saves = self.failed_saves
+        self.save_queue.flush()
+        # The inputs of a failed save are given back, the window stays open
+        self.render_queue.flush()
+        if self.failed_saves > failed_saves:
+            return
+        self.save_queue.stop()
+        self.scheduler.shutdown()
+        get_storage().close()
+        self.render_queue.stop()
         self.root.destroy()
@@ -0,0 +1,81 @@
+"""Images stored once by content, shared by all the collections
+
+The number of entries referencing each blob is recorded when they are saved.
+The entries are never removed, so the blobs are never deleted.
+"""
+
+from hashlib import sha256
+from json import JSONDecodeError, dump, load
+from os import replace
+from threading import Lock
+
+from .configuration import (
+    BLOB_FOLDER,
+    BLOB_PREFIX,
+    BLOB_REFERENCES_FILE_NAME,
+    SAVE_FOLDER,
+)
+from .files import create_full_path, get_image_file_name
+
+# Only one thread at a time can modify the references
+references_lock = Lock()
+
+
+def is_blob(image_name):
+    """Return True if the image name references a blob"""
+    return image_name.startswith(BLOB_PREFIX)
+
+
+def hash_image(image):
+    """Return the hash of the pixels of an image"""
+    image_hash = sha256(f"{image.mode}|{image.width}x{image.height}|".encode("utf8"))
+    image_hash.update(image.tobytes())
+    return image_hash.hexdigest()
+
+
+def get_blob_path(image_name):
+    """Return the path of a blob from its image name"""
+    digest = image_name[len(BLOB_PREFIX) :]
+    return f"{SAVE_FOLDER}/{BLOB_FOLDER}/{digest[:2]}/{get_image_file_name(image_name)}"
+
+
+def get_references_path():
+    """Return the path of the file containing the number of references of each blob"""
+    return f"{SAVE_FOLDER}/{BLOB_FOLDER}/{BLOB_REFERENCES_FILE_NAME}"
+
+
+def read_references():
+    """Return the number of references of each blob"""
+    try:
+        with open(get_references_path(), "r", encoding="utf8") as opened_file:
+            return load(opened_file)
+    except (FileNotFoundError, JSONDecodeError):
+        return {}
+
+
+def write_references(references):
+    """Save the number of references of each blob"""
+    create_full_path(f"{SAVE_FOLDER}/{BLOB_FOLDER}")
+    temporary_path = f"{get_references_path()}.tmp"
+    with open(temporary_path, "w", encoding="utf8") as opened_file:
+        dump(references, opened_file)
+    replace(temporary_path, get_references_path())
+
+
+def get_blob_name(image, extension=""):
+    """Return the image name of the blob of an image"""
+    return get_digest_blob_name(hash_image(image), extension)
+
+
+def get_digest_blob_name(digest, extension=""):
+    """Return the image name of the blob of an image from the hash of its pixels"""
+    return f"{BLOB_PREFIX}{digest}{extension}"
+
+
+def add_blob_references(image_names):
+    """Add a reference to each blob of a list of image names"""
+    with references_lock:
+        references = read_references()
+        for image_name in image_names:
+            references[image_name] = references.get(image_name, 0) + 1
+        write_references(references)
@@ -0,0 +1,161 @@
+"""Cached list of the collections and manifest of each collection
+
+The manifest of a collection keeps its number of entries and images, the
+size of its files and the time of its last modification. It is updated by
+each save and rebuilt when the text file was modified by something else.
+"""
+
+from json import JSONDecodeError, dump, load
+from os import path, replace, scandir, stat
+from threading import Lock
+from time import time
+
+from .configuration import MANIFEST_FILE_NAME, SAVE_FOLDER
+from .storage import get_storage
+from .text_index import get_text_path
+
+# Names of the collections and modification time of the save folder
+collections_cache = {"modified": None, "collections": []}
+# Only one thread at a time can write a manifest
+manifest_lock = Lock()
+
+
+def list_collections():
+    """Return the names of the collections, read again only when the save folder changed"""
+    try:
+        modified = stat(SAVE_FOLDER).st_mtime_ns
+    except OSError:
+        return []
+    if modified != collections_cache["modified"]:
+        with scandir(SAVE_FOLDER) as entries:
+            collections_cache["collections"] = sorted(
+                entry.name
+                for entry in entries
+                if not entry.name.startswith(".") and entry.is_dir()
+            )
+        collections_cache["modified"] = modified
+    return list(collections_cache["collections"])
+
+
+def invalidate_collections():
+    """Read the collections again on the next call of list_collections"""
+    collections_cache["modified"] = None
+
+
+def get_manifest_path(collection):
+    """Return the path of the manifest of a collection"""
+    return f"{SAVE_FOLDER}/{collection}/{MANIFEST_FILE_NAME}"
+
+
+def get_text_size(collection):
+    """Return the size of the text file of a collection, 0 if it does not exist"""
+    try:
+        return path.getsize(get_text_path(collection))
+    except OSError:
+        return 0
+
+
+def get_files_size(folder):
+    """Return the size in bytes and the last modification time of the files of a folder
+
+    The hidden files and folders (indexes, thumbnails...) are not counted.
+    """
+    size = 0
+    modified = 0
+    try:
+        with scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    folder_size, folder_modified = get_files_size(entry.path)
+                    size += folder_size
+                    modified = max(modified, folder_modified)
+                elif entry.is_file(follow_symlinks=False):
+                    entry_stat = entry.stat()
+                    size += entry_stat.st_size
+                    modified = max(modified, entry_stat.st_mtime)
+    except OSError:
+        pass
+    return size, modified
+
+
+def build_manifest(collection):
+    """Return the manifest of a collection computed from its files"""
+    image_counts = get_storage().image_counts(collection)
+    size, modified = get_files_size(f"{SAVE_FOLDER}/{collection}")
+    return {
+        "entries": len(image_counts),
+        "images": sum(image_counts),
+        "bytes": size,
+        "modified": modified,
+        "text_size": get_text_size(collection),
+    }
+
+
+def write_manifest(collection, manifest):
+    """Save the manifest of a collection"""
+    temporary_path = f"{get_manifest_path(collection)}.tmp"
+    try:
+        with open(temporary_path, "w", encoding="utf8") as opened_file:
+            dump(manifest, opened_file)
+        replace(temporary_path, get_manifest_path(collection))
+    except OSError as error:
+        print(f"Cannot save the manifest.\n{error}")
+
+
+def read_manifest(collection):
+    """Return the manifest of a collection, rebuilt if it is missing or outdated"""
+    with manifest_lock:
+        try:
+            with open(
+                get_manifest_path(collection), "r", encoding="utf8"
+            ) as opened_file:
+                manifest = load(opened_file)
+            if manifest.get("text_size") == get_text_size(collection):
+                return manifest
+        except (FileNotFoundError, JSONDecodeError):
+            pass
+
+        manifest = build_manifest(collection)
+        write_manifest(collection, manifest)
+        return manifest
+
+
+def update_manifest(collection, image_count, file_paths, text_size):
+    """Add a saved entry to the manifest of a collection
+
+    The file paths are the image files written in the collection folder, the
+    text size is the size of the text file before the save.
+    """
+    with manifest_lock:
+        try:
+            with open(
+                get_manifest_path(collection), "r", encoding="utf8"
+            ) as opened_file:
+                manifest = load(opened_file)
+        except (FileNotFoundError, JSONDecodeError):
+            manifest = None
+
+        if manifest is None or manifest.get("text_size") != text_size:
+            # Missing or outdated, the new entry is already in the files
+            manifest = build_manifest(collection)
+        else:
+            new_text_size = get_text_size(collection)
+            added_size = new_text_size - text_size
+            for file_path in file_paths:
+                try:
+                    added_size += path.getsize(file_path)
+                except OSError:
+                    continue
+            manifest["entries"] += 1
+            manifest["images"] += image_count
+            manifest["bytes"] += added_size
+            manifest["modified"] = time()
+            manifest["text_size"] = new_text_size
+        write_manifest(collection, manifest)
+
+
+def get_catalog():
+    """Return the manifest of each collection"""
+    return {collection: read_manifest(collection) for collection in list_collections()}
@@ -0,0 +1,299 @@
+"""Command line interface working without the GUI
+
+python -m note_save save COLLECTION [IMAGE ...] < text
+python -m note_save list-collections
+python -m note_save dump COLLECTION
+python -m note_save page COLLECTION PAGE [--oldest-first]
+python -m note_save stats [COLLECTION ...]
+python -m note_save import FOLDER COLLECTION [--workers N]
+python -m note_save export COLLECTION [OUTPUT] [--format zip|tar.gz] [--entries]
+
+The GUI modules, tkinter and PIL are only imported by the commands needing them.
+"""
+
+import sys
+from argparse import ArgumentParser
+from json import dumps
+
+from .catalog import list_collections, read_manifest
+from .configuration import ARCHIVE_FORMATS, IMPORT_WORKERS, SAVE_FOLDER
+from .files import is_folder, valid_file_name
+from .layout import PageLayout
+from .load import format_json_entry
+from .storage import get_storage
+
+# Entries loaded at once while dumping a collection
+DUMP_PAGE_SIZE = 1000
+
+
+def command_save(arguments):
+    """Save the text of the standard input and the images of the paths"""
+    # Only this command needs the images
+    from .clipboard_image import load_image  # pylint: disable=import-outside-toplevel
+    from .encoding import (  # pylint: disable=import-outside-toplevel
+        shutdown_encoding_pool,
+    )
+    from .save import save  # pylint: disable=import-outside-toplevel
+
+    if len(arguments.collection) == 0 or not valid_file_name(arguments.collection):
+        print(f"Invalid collection name: {arguments.collection}", file=sys.stderr)
+        return 1
+
+    text = "" if sys.stdin.isatty() else sys.stdin.read().strip()
+    images = []
+    for image_path in arguments.images:
+        # Same limits as the pasted images
+        image, message = load_image(image_path)
+        if message is not None:
+            print(message, file=sys.stderr)
+        if image is None:
+            print(f"Cannot open the image {image_path}.", file=sys.stderr)
+            return 1
+        try:
+            image.load()
+        except OSError as error:
+            print(f"Cannot open the image.\n{error}", file=sys.stderr)
+            return 1
+        images.append(image)
+
+    if len(text) == 0 and len(images) == 0:
+        print("Nothing to save.", file=sys.stderr)
+        return 1
+    try:
+        return 0 if save(arguments.collection, text, images) else 1
+    finally:
+        shutdown_encoding_pool()
+
+
+def command_list_collections(arguments):
+    """Print the names of the collections, one by line"""
+    del arguments
+    for collection in list_collections():
+        print(collection)
+    return 0
+
+
+def command_dump(arguments):
+    """Print all the entries of a collection as a JSON array, oldest first"""
+    storage = get_storage()
+    count = storage.count(arguments.collection)
+    sys.stdout.write("[")
+    for start in range(0, count, DUMP_PAGE_SIZE):
+        entries = storage.page(arguments.collection, start, start + DUMP_PAGE_SIZE)
+        for entry_number, entry in enumerate(entries, start):
+            # Written entry by entry, the collection is never in memory
+            sys.stdout.write(",\n" if entry_number > 0 else "\n")
+            sys.stdout.write(
+                dumps(format_json_entry(entry_number, entry), ensure_ascii=False)
+            )
+    sys.stdout.write("\n]\n" if count > 0 else "]\n")
+    return 0
+
+
+def command_page(arguments):
+    """Print the entries of a page of the explorer as a JSON object"""
+    storage = get_storage()
+    image_counts = storage.image_counts(arguments.collection)
+    entry_numbers = list(range(len(image_counts)))
+    if not arguments.oldest_first:
+        # Same order as the explorer, the last saved entries first
+        entry_numbers.reverse()
+
+    layout = PageLayout()
+    layout.extend(image_counts[entry_number] for entry_number in entry_numbers)
+    if not 1 <= arguments.page <= max(1, layout.page_count()):
+        print(
+            f"Invalid page, the collection has {layout.page_count()} pages.",
+            file=sys.stderr,
+        )
+        return 1
+
+    entries = []
+    if layout.page_count() > 0:
+        starting_index, ending_index = layout.page_range(arguments.page - 1)
+        page_numbers = entry_numbers[starting_index:ending_index]
+        entries = [
+            format_json_entry(entry_number, entry)
+            for entry_number, entry in zip(
+                page_numbers, storage.get(arguments.collection, page_numbers)
+            )
+        ]
+    print(
+        dumps(
+            {
+                "page": arguments.page,
+                "pages": layout.page_count(),
+                "entries": entries,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+    return 0
+
+
+def command_stats(arguments):
+    """Print the number of entries and images and the size of collections as JSON"""
+    stats = {}
+    for collection in arguments.collections or list_collections():
+        if not is_folder(f"{SAVE_FOLDER}/{collection}"):
+            print(f"Unknown collection: {collection}", file=sys.stderr)
+            return 1
+        manifest = read_manifest(collection)
+        stats[collection] = {
+            "entries": manifest["entries"],
+            "images": manifest["images"],
+            "size": manifest["bytes"],
+            "modified": manifest["modified"],
+        }
+    print(dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+def command_import(arguments):
+    """Import the images and text files of a folder tree into a collection"""
+    # Only this command needs the images
+    from .encoding import (  # pylint: disable=import-outside-toplevel
+        shutdown_encoding_pool,
+    )
+    from .importer import import_folder  # pylint: disable=import-outside-toplevel
+
+    if len(arguments.collection) == 0 or not valid_file_name(arguments.collection):
+        print(f"Invalid collection name: {arguments.collection}", file=sys.stderr)
+        return 1
+    if not is_folder(arguments.folder):
+        print(f"Unknown folder: {arguments.folder}", file=sys.stderr)
+        return 1
+
+    def print_progress(done, total, message):
+        if message is not None:
+            print(f"\n{message}", file=sys.stderr)
+        print(f"\r{done}/{total} files", end="", file=sys.stderr, flush=True)
+
+    try:
+        imported, skipped, failed = import_folder(
+            arguments.folder,
+            arguments.collection,
+            arguments.workers,
+            print_progress,
+        )
+    finally:
+        shutdown_encoding_pool()
+    print(file=sys.stderr)
+    print(dumps({"imported": imported, "skipped": skipped, "failed": failed}, indent=2))
+    return 1 if failed > 0 else 0
+
+
+def command_export(arguments):
+    """Write a collection to a zip or tar.gz archive, to a file or the standard output"""
+    from .export import (  # pylint: disable=import-outside-toplevel
+        export_collection,
+    )
+
+    if not is_folder(f"{SAVE_FOLDER}/{arguments.collection}"):
+        print(f"Unknown collection: {arguments.collection}", file=sys.stderr)
+        return 1
+    archive_format = arguments.format
+    if archive_format is None:
+        archive_format = (
+            "tar.gz" if arguments.output.endswith((".tar.gz", ".tgz")) else "zip"
+        )
+
+    try:
+        if arguments.output == "-":
+            image_count = export_collection(
+                arguments.collection,
+                sys.stdout.buffer,
+                archive_format,
+                arguments.entries,
+            )
+        else:
+            with open(arguments.output, "wb") as opened_file:
+                image_count = export_collection(
+                    arguments.collection,
+                    opened_file,
+                    archive_format,
+                    arguments.entries,
+                )
+    except OSError as error:
+        print(f"Cannot export the collection.\n{error}", file=sys.stderr)
+        return 1
+    print(f"{image_count} image{'s' * (image_count != 1)} exported.", file=sys.stderr)
+    return 0
+
+
+def main(arguments=None):
+    """Run the command of the command line arguments, return the exit code"""
+    parser = ArgumentParser(
+        prog="python -m note_save",
+        description="Without command, the application window is opened.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    save_parser = subparsers.add_parser(
+        "save", help="save the text of the standard input and images"
+    )
+    save_parser.add_argument("collection")
+    save_parser.add_argument("images", nargs="*", help="paths of image files")
+    save_parser.set_defaults(function=command_save)
+
+    list_parser = subparsers.add_parser(
+        "list-collections", help="print the names of the collections"
+    )
+    list_parser.set_defaults(function=command_list_collections)
+
+    dump_parser = subparsers.add_parser(
+        "dump", help="print all the entries of a collection as JSON"
+    )
+    dump_parser.add_argument("collection")
+    dump_parser.set_defaults(function=command_dump)
+
+    page_parser = subparsers.add_parser(
+        "page", help="print a page of the explorer as JSON"
+    )
+    page_parser.add_argument("collection")
+    page_parser.add_argument("page", type=int, help="page number, from 1")
+    page_parser.add_argument(
+        "--oldest-first", action="store_true", help="like the Reverse checkbox"
+    )
+    page_parser.set_defaults(function=command_page)
+
+    stats_parser = subparsers.add_parser(
+        "stats", help="print the statistics of collections as JSON"
+    )
+    stats_parser.add_argument("collections", nargs="*", help="all by default")
+    stats_parser.set_defaults(function=command_stats)
+
+    import_parser = subparsers.add_parser(
+        "import",
+        help="import the images and text files of a folder, resumed if interrupted",
+    )
+    import_parser.add_argument("folder")
+    import_parser.add_argument("collection")
+    import_parser.add_argument(
+        "--workers", type=int, default=IMPORT_WORKERS, help="threads opening the files"
+    )
+    import_parser.set_defaults(function=command_import)
+
+    export_parser = subparsers.add_parser(
+        "export", help="write a collection and its images to a zip or tar.gz archive"
+    )
+    export_parser.add_argument("collection")
+    export_parser.add_argument(
+        "output",
+        nargs="?",
+        default="-",
+        help="archive file, standard output by default",
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=ARCHIVE_FORMATS,
+        help="from the extension of the output, zip by default",
+    )
+    export_parser.add_argument(
+        "--entries", action="store_true", help="add the entries as a JSON file"
+    )
+    export_parser.set_defaults(function=command_export)
+
+    arguments = parser.parse_args(arguments)
+    return arguments.function(arguments)
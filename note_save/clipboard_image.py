@@ -1,7 +1,20 @@
 """Getting images from the clipboard"""
 
+from math import sqrt
+from os import path as os_path
+from warnings import catch_warnings, simplefilter
+
 from PIL import Image, ImageGrab
 
+from .configuration import (
+    IMAGE_DOWNSCALE_BYTES,
+    IMAGE_DOWNSCALE_PIXELS,
+    IMAGE_MAX_PIXELS,
+)
+
+# Larger images are refused by Image.open, before their pixels are decoded
+Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+
 
 def get_clipboard():
     """Return an image, a list of file names or None"""
@@ -11,31 +24,83 @@ def get_clipboard():
         return None
 
 
+def get_downscale_pixels(image):
+    """Return the maximum number of pixels of an image after the ingest, None without limit"""
+    limits = []
+    if IMAGE_DOWNSCALE_PIXELS is not None:
+        limits.append(IMAGE_DOWNSCALE_PIXELS)
+    if IMAGE_DOWNSCALE_BYTES is not None:
+        # Size of the decoded pixels
+        limits.append(IMAGE_DOWNSCALE_BYTES // len(image.getbands()))
+    return min(limits, default=None)
+
+
+def limit_image(image, name="The image"):
+    """Return the image downscaled with the ingest policy, None if it is too large
+
+    A message is also returned when the image is refused or downscaled, None
+    otherwise. The pixels of an opened image are only decoded if it is accepted.
+    """
+    pixels = image.width * image.height
+    if IMAGE_MAX_PIXELS is not None and pixels > IMAGE_MAX_PIXELS:
+        return None, (
+            f"{name} is too large ({image.width}x{image.height}), "
+            f"the limit is {IMAGE_MAX_PIXELS} pixels."
+        )
+
+    max_pixels = get_downscale_pixels(image)
+    if max_pixels is None or pixels <= max_pixels:
+        return image, None
+
+    scale = sqrt(max_pixels / pixels)
+    size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+    # The JPEG decoder skips most of the pixels of an opened image
+    image.thumbnail(size)
+    return image, (
+        f"{name} was downscaled from {pixels // 1_000_000} megapixels "
+        f"to {image.width}x{image.height}."
+    )
+
+
 def load_image(path):
-    """Return the opened Image or None"""
+    """Return the opened Image or None, and a message if it is refused or downscaled"""
+    name = os_path.basename(path)
     try:
-        return Image.open(path)
-    except (Image.UnidentifiedImageError, FileNotFoundError):
-        return None
+        with catch_warnings():
+            # Over IMAGE_MAX_PIXELS, Pillow only warns until twice the limit
+            simplefilter("error", Image.DecompressionBombWarning)
+            image = Image.open(path)
+    except (Image.DecompressionBombWarning, Image.DecompressionBombError) as error:
+        return None, f"{name} is too large.\n{error}"
+    except (Image.UnidentifiedImageError, OSError):
+        return None, None
+    return limit_image(image, name)
 
 
 def get_clipboard_images():
-    """Return a list of images from the clipboard"""
+    """Return a list of images from the clipboard and the messages of the ingest"""
     images = []
+    messages = []
 
     clipboard_content = get_clipboard()
     if clipboard_content is None:
-        return images
+        return images, messages
     if isinstance(clipboard_content, Image.Image):
         # Is a single image
-        images.append(clipboard_content)
+        data, message = limit_image(clipboard_content)
+        if data is not None:
+            images.append(data)
+        if message is not None:
+            messages.append(message)
 
     elif isinstance(clipboard_content, list):
         # Is a list of paths
         for path in clipboard_content:
-            data = load_image(path)
+            data, message = load_image(path)
             if data is not None:
                 # The data is an image
                 images.append(data)
+            if message is not None:
+                messages.append(message)
 
-    return images
+    return images, messages
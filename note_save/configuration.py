@@ -9,10 +9,59 @@ DEFAULT_PADDING = 10
 
 TEXT_LINE_HEIGHT = 5
 
+# Extension of the image names saved without extension
 IMAGE_EXTENSION = ".png"
 IMAGE_EXTENSION_TYPE = "PNG"
 
+# Storage profiles of the images: extension, Pillow format and save options
+IMAGE_PROFILES = {
+    # Pillow default settings
+    "png": (".png", "PNG", {}),
+    "png-fast": (".png", "PNG", {"compress_level": 1}),
+    "png-max": (".png", "PNG", {"optimize": True}),
+    "webp-lossless": (".webp", "WEBP", {"lossless": True}),
+    # Lossy, for photos
+    "webp": (".webp", "WEBP", {"quality": 90}),
+    "jpeg": (".jpg", "JPEG", {"quality": 90}),
+}
+IMAGE_PROFILE = "png"
+
+# Groups of images encoded in parallel, with a process by CPU by default
+PARALLEL_ENCODING_MIN_IMAGES = 2
+ENCODING_PROCESSES = None
+
+# Store identical images once, in a hidden folder shared by the collections
+DEDUPLICATE_IMAGES = False
+BLOB_FOLDER = ".blobs"
+# Image names referencing a blob, followed by the hash of the image
+BLOB_PREFIX = "sha256-"
+BLOB_REFERENCES_FILE_NAME = "references.json"
+
+# Storage of the entries: "files" (a text file by collection) or "sqlite"
+STORAGE_BACKEND = "files"
+# Database in the save folder used by the "sqlite" storage
+SQLITE_DATABASE_FILE_NAME = ".notes.db"
+# Also keep a copy of the image files in the database, missing files are restored from it
+SQLITE_STORE_IMAGES = False
+
 TEXT_FILE_NAME = "TEXTS.txt"
+# Entry log replacing the text file in the version 2 of the format
+LOG_FILE_NAME = "TEXTS.log"
+# Format of the text file of the new collections: 1 (TEXTS.txt) or 2 (TEXTS.log)
+TEXT_FILE_VERSION = 1
+# Hidden index of the entries positions in the text file
+TEXT_INDEX_FILE_NAME = ".TEXTS.idx"
+# Hidden index of the words of the entries, for the search
+SEARCH_INDEX_FILE_NAME = ".search.idx"
+# Hidden counts and size of the entries of each collection
+MANIFEST_FILE_NAME = ".manifest.json"
+
+# Hidden folder inside each collection
+THUMBNAIL_FOLDER = ".thumbnails"
+THUMBNAIL_EXTENSION = ".png"
+THUMBNAIL_EXTENSION_TYPE = "PNG"
+# Maximum size of the thumbnails of a collection in bytes
+THUMBNAIL_CACHE_MAX_SIZE = 100 * 1024 * 1024
 
 # Between each entry
 TEXT_MARKER = "\x1f<§█ Entry █§>"
@@ -32,6 +81,60 @@ SECONDARY_BACKGROUND_COLOR = "#FFFFFF"
 TEXT_COLOR = "#000000"
 
 MAX_PREVIEW_IMAGE_SIZE = 150
+# Images are reduced by an integer factor until this many times the preview size
+PREVIEW_REDUCING_GAP = 2.0
 PREVIEW_IMAGES_BY_LINE = 8
+# Previews of larger pasted images are computed in the background
+LARGE_IMAGE_PIXELS = 25_000_000
+
+# Pasted images with more pixels are refused, None to accept all the images
+IMAGE_MAX_PIXELS = 100_000_000
+# Pasted images are downscaled to this many pixels or decoded bytes, None to keep them
+IMAGE_DOWNSCALE_PIXELS = None
+IMAGE_DOWNSCALE_BYTES = None
 
 EXPLORER_MAX_LINES_BY_PAGE = 2
+# Delay after the last key typed in the search field before searching in milliseconds
+EXPLORER_SEARCH_DELAY = 300
+# Delay between the checks for entries saved by other processes in milliseconds
+EXPLORER_FOLLOW_DELAY = 1000
+
+# Continuous scrolling mode of the explorer
+EXPLORER_SCROLL_WIDTH = 1400
+EXPLORER_SCROLL_HEIGHT = 600
+# Estimated height of a line of entries in pixels, until it is displayed
+EXPLORER_SCROLL_ROW_HEIGHT = 250
+# Rows kept displayed above and below the viewport
+EXPLORER_SCROLL_OVERSCAN = 1
+
+# Threads loading the images and doing the other background tasks
+BACKGROUND_WORKERS = 4
+
+# Import of folders: files imported, threads opening them and hidden checkpoints
+IMPORT_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp")
+IMPORT_TEXT_EXTENSIONS = (".txt", ".md")
+IMPORT_WORKERS = 4
+IMPORT_CHECKPOINT_PREFIX = ".import-"
+# Imported files between two evictions of the thumbnail cache
+IMPORT_EVICT_INTERVAL = 500
+
+# Export of collections: bytes copied and compressed at once, threads
+# compressing the text of tar.gz archives, file of the entries as JSON and
+# formats of the archives
+EXPORT_BLOCK_SIZE = 1024 * 1024
+EXPORT_COMPRESS_LEVEL = 6
+EXPORT_WORKERS = 4
+EXPORT_ENTRIES_FILE_NAME = "entries.json"
+ARCHIVE_FORMATS = ("zip", "tar.gz")
+
+# Saves waiting to be written before the inputs are blocked
+SAVE_QUEUE_SIZE = 16
+# Pasted images kept encoded in memory until this many bytes, the next ones
+# wait in a hidden staging folder until they are saved
+STAGING_MEMORY_BUDGET = 64 * 1024 * 1024
+STAGING_FOLDER = ".staging"
+
+# Delay between two displays of the background tasks results in milliseconds
+RENDER_QUEUE_INTERVAL = 15
+# Maximum time spent displaying the results at each interval in milliseconds
+RENDER_QUEUE_TIME_BUDGET = 10
@@ -0,0 +1,89 @@
+"""Convert the text files of the collections to another version of the format
+
+python -m note_save.convert [--version 2] [collection ...]
+
+The application should be closed during the conversion.
+"""
+
+from argparse import ArgumentParser
+from os import remove, replace
+
+from .configuration import LOG_FILE_NAME, SAVE_FOLDER, TEXT_FILE_NAME, TEXT_MARKER
+from .entry_log import LOG_MAGIC, encode_record, get_file_version
+from .files import list_folders
+from .load import EntrySequence
+from .search import get_search_index_path
+from .storage import format_entry
+from .text_index import get_index_path, get_text_path, index_lock
+
+BACKUP_EXTENSION = ".bak"
+
+
+def convert_collection(collection, version=2):
+    """Rewrite the text file of a collection in a version of the format
+
+    The previous file is kept with the backup extension. Return the number
+    of entries converted, None if the file is missing or already converted.
+    """
+    source = get_text_path(collection)
+    if get_file_version(source) in (None, version):
+        return None
+    target_name = LOG_FILE_NAME if version == 2 else TEXT_FILE_NAME
+    target = f"{SAVE_FOLDER}/{collection}/{target_name}"
+
+    # Write to a temporary file first so the text file is never partial
+    temporary_path = f"{target}.tmp"
+    with EntrySequence(collection) as entries, open(
+        temporary_path, "wb"
+    ) as opened_file:
+        if version == 2:
+            opened_file.write(LOG_MAGIC)
+        for entry_number, (image_names, text) in enumerate(entries):
+            if version == 2:
+                opened_file.write(encode_record(image_names, text))
+                continue
+            if TEXT_MARKER in text:
+                print(
+                    f"The entry {entry_number} of {collection} contains the entry "
+                    "marker, it will be read as several entries."
+                )
+            opened_file.write(format_entry(image_names, text).encode("utf8"))
+        count = len(entries)
+
+    with index_lock:
+        replace(source, f"{source}{BACKUP_EXTENSION}")
+        replace(temporary_path, target)
+        # The indexes are rebuilt when read, the entries may have changed
+        for index_path in (
+            get_index_path(collection),
+            get_search_index_path(collection),
+        ):
+            try:
+                remove(index_path)
+            except FileNotFoundError:
+                pass
+    return count
+
+
+def main(arguments=None):
+    """Convert the collections given in the command line arguments"""
+    parser = ArgumentParser(
+        prog="python -m note_save.convert",
+        description="Convert the text files of the collections to another version.",
+    )
+    parser.add_argument("--version", type=int, choices=(1, 2), default=2)
+    parser.add_argument(
+        "collections", nargs="*", help="collections to convert, all by default"
+    )
+    arguments = parser.parse_args(arguments)
+
+    for collection in arguments.collections or list_folders(SAVE_FOLDER):
+        count = convert_collection(collection, arguments.version)
+        if count is not None:
+            print(
+                f"{collection}: {count} entr{'ies' if count != 1 else 'y'} converted."
+            )
+
+
+if __name__ == "__main__":
+    main()
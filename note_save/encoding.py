@@ -0,0 +1,76 @@
+"""Encoding of the images to files, in parallel for groups of images"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from os import cpu_count, replace
+from threading import Lock
+
+from .configuration import (
+    ENCODING_PROCESSES,
+    IMAGE_PROFILE,
+    IMAGE_PROFILES,
+    PARALLEL_ENCODING_MIN_IMAGES,
+)
+
+# Started on the first group of images and reused for the next ones
+encoding_pool = None  # pylint: disable=invalid-name
+encoding_pool_lock = Lock()
+
+
+def write_image(image, file, profile=IMAGE_PROFILE):
+    """Write an image with a storage profile to a path or a file object"""
+    _, image_format, options = IMAGE_PROFILES[profile]
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        # No transparency in JPEG
+        image = image.convert("RGB")
+    image.save(file, image_format, **options)
+
+
+def encode_image(image, image_path, profile=IMAGE_PROFILE):
+    """Save an image to a file with a storage profile, can be executed in another process"""
+    # Write to a temporary file first so an image file is never partial
+    temporary_path = f"{image_path}.tmp"
+    write_image(image, temporary_path, profile)
+    replace(temporary_path, image_path)
+
+
+def get_encoding_pool():
+    """Return the pool of processes encoding the images"""
+    global encoding_pool  # pylint: disable=global-statement
+    with encoding_pool_lock:
+        if encoding_pool is None:
+            encoding_pool = ProcessPoolExecutor(ENCODING_PROCESSES)
+        return encoding_pool
+
+
+def encode_images(
+    encodings, profile=IMAGE_PROFILE, parallel_min_images=PARALLEL_ENCODING_MIN_IMAGES
+):
+    """Save the images of a list of (image, path), in parallel if there are enough images"""
+    # Sending the images to other processes is slower with a single CPU
+    if len(encodings) >= parallel_min_images and (cpu_count() or 1) > 1:
+        images = [image for image, _ in encodings]
+        image_paths = [image_path for _, image_path in encodings]
+        try:
+            # Consume the results to raise the errors of the processes
+            list(
+                get_encoding_pool().map(
+                    encode_image, images, image_paths, [profile] * len(images)
+                )
+            )
+            return
+        except BrokenProcessPool as error:
+            print(f"Cannot encode the images in parallel.\n{error}")
+            shutdown_encoding_pool()
+
+    for image, image_path in encodings:
+        encode_image(image, image_path, profile)
+
+
+def shutdown_encoding_pool():
+    """Stop the processes encoding the images"""
+    global encoding_pool  # pylint: disable=global-statement
+    with encoding_pool_lock:
+        if encoding_pool is not None:
+            encoding_pool.shutdown(cancel_futures=True)
+            encoding_pool = None
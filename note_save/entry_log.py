@@ -0,0 +1,118 @@
+"""Version 2 of the text file of a collection: a log of length-prefixed records
+
+The file starts with LOG_MAGIC, followed by the records:
+    header (payload length, CRC-32 of the payload), payload, payload length
+The payload contains the number of images, each image name prefixed by its
+length, then the text. The length after the payload allows reading the
+records backward, and the records can be skipped without decoding them.
+"""
+
+from struct import Struct
+from zlib import crc32
+
+LOG_MAGIC = b"NSL\x02"
+# Payload length and checksum
+RECORD_HEADER = Struct("<II")
+# Payload length, repeated after the payload
+RECORD_TRAILER = Struct("<I")
+# Number of images and length of an image name
+IMAGE_COUNT = Struct("<H")
+NAME_LENGTH = Struct("<H")
+
+# Bytes of a record around its payload
+RECORD_OVERHEAD = RECORD_HEADER.size + RECORD_TRAILER.size
+
+
+def is_log(data):
+    """Return True if the beginning of a file is the one of an entry log"""
+    return data[: len(LOG_MAGIC)] == LOG_MAGIC
+
+
+def get_file_version(file):
+    """Return the version of a text file, 1 or 2, None if it is missing"""
+    try:
+        with open(file, "rb") as opened_file:
+            return 2 if is_log(opened_file.read(len(LOG_MAGIC))) else 1
+    except FileNotFoundError:
+        return None
+
+
+def encode_record(image_names, text):
+    """Return the bytes of the record of an entry"""
+    image_names = [name.encode("utf8") for name in image_names if len(name) > 0]
+    payload = bytearray(IMAGE_COUNT.pack(len(image_names)))
+    for name in image_names:
+        payload += NAME_LENGTH.pack(len(name))
+        payload += name
+    payload += text.encode("utf8")
+    return (
+        RECORD_HEADER.pack(len(payload), crc32(payload))
+        + payload
+        + RECORD_TRAILER.pack(len(payload))
+    )
+
+
+def decode_record(record):
+    """Return the (image names, text) of the bytes of a record
+
+    Raise ValueError if the record is corrupted.
+    """
+    length, checksum = RECORD_HEADER.unpack_from(record)
+    payload = bytes(record[RECORD_HEADER.size : RECORD_HEADER.size + length])
+    if len(payload) != length or crc32(payload) != checksum:
+        raise ValueError("corrupted entry")
+
+    (image_count,) = IMAGE_COUNT.unpack_from(payload)
+    position = IMAGE_COUNT.size
+    image_names = []
+    for _ in range(image_count):
+        (name_length,) = NAME_LENGTH.unpack_from(payload, position)
+        position += NAME_LENGTH.size
+        image_names.append(payload[position : position + name_length].decode("utf8"))
+        position += name_length
+    # An entry without image has an empty name, like in the version 1
+    return (image_names or [""], payload[position:].decode("utf8"))
+
+
+def read_record_at(data, offset):
+    """Return the (offset, length, image count) of the record at an offset, None if incomplete"""
+    if offset + RECORD_HEADER.size + IMAGE_COUNT.size > len(data):
+        return None
+    length, _ = RECORD_HEADER.unpack_from(data, offset)
+    end = offset + RECORD_HEADER.size + length + RECORD_TRAILER.size
+    if length < IMAGE_COUNT.size or end > len(data):
+        return None
+    if RECORD_TRAILER.unpack_from(data, end - RECORD_TRAILER.size)[0] != length:
+        return None
+    (image_count,) = IMAGE_COUNT.unpack_from(data, offset + RECORD_HEADER.size)
+    return (offset, end - offset, image_count)
+
+
+def iter_records(data, start=len(LOG_MAGIC)):
+    """Yield the (offset, length, image count) of the records of a log from a byte offset
+
+    The payloads are skipped, the reading stops at a partially written record.
+    """
+    offset = max(start, len(LOG_MAGIC))
+    while True:
+        record = read_record_at(data, offset)
+        if record is None:
+            return
+        yield record
+        offset += record[1]
+
+
+def iter_records_backward(data, end=None):
+    """Yield the (offset, length, image count) of the records of a log from the last one"""
+    end = len(data) if end is None else end
+    while end - len(LOG_MAGIC) >= RECORD_OVERHEAD + IMAGE_COUNT.size:
+        (length,) = RECORD_TRAILER.unpack_from(data, end - RECORD_TRAILER.size)
+        offset = end - RECORD_OVERHEAD - length
+        record = read_record_at(data, offset) if offset >= len(LOG_MAGIC) else None
+        if record is None or offset + record[1] != end:
+            # Partially written last record, start from the last complete one
+            records = list(iter_records(data[:end]))
+            yield from reversed(records)
+            return
+        yield record
+        end = offset
@@ -0,0 +1,251 @@
+"""Streaming export of a collection to a zip or tar.gz archive
+
+The archive contains the text file of the collection and the images of its
+entries, with their paths in the save folder: extracted in a save folder,
+the collection can be opened again. The files are copied by chunks, never
+loaded whole in memory, and the output can be a pipe.
+
+The images are already compressed, they are stored as they are. In a
+tar.gz archive, the text is compressed in parallel by blocks, each block is
+a gzip member.
+"""
+
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from gzip import compress
+from json import dumps
+from os import path, stat
+from tarfile import GNU_FORMAT, TarInfo
+from tempfile import SpooledTemporaryFile
+from time import localtime, time
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from .configuration import (
+    EXPORT_BLOCK_SIZE,
+    EXPORT_COMPRESS_LEVEL,
+    EXPORT_ENTRIES_FILE_NAME,
+    EXPORT_WORKERS,
+    SAVE_FOLDER,
+    TEXT_FILE_NAME,
+)
+from .load import format_json_entry, get_image_path
+from .storage import format_entry, get_storage
+from .text_index import get_text_path
+
+# Entries loaded at once while listing the images
+EXPORT_PAGE_SIZE = 1000
+# Size of the blocks of a tar archive
+TAR_BLOCK_SIZE = 512
+# Files modified before 1980 are dated 1980 in a zip archive
+ZIP_MIN_TIME = 315_619_200
+
+
+def copy_file(source, target, size):
+    """Copy the first bytes of a file by chunks, the file may grow while it is copied"""
+    while size > 0:
+        data = source.read(min(size, EXPORT_BLOCK_SIZE))
+        if len(data) == 0:
+            raise OSError("A file was truncated during the export.")
+        target.write(data)
+        size -= len(data)
+
+
+class ParallelGzipWriter:
+    """Binary file compressing the written data as gzip members in parallel
+
+    The data is cut in blocks compressed by a pool of threads and written in
+    order, a block is compressed at the level set when it was written.
+    """
+
+    def __init__(self, output, workers=EXPORT_WORKERS, block_size=EXPORT_BLOCK_SIZE):
+        self.output = output
+        self.workers = workers
+        self.block_size = block_size
+        self.level = EXPORT_COMPRESS_LEVEL
+
+        self.executor = ThreadPoolExecutor(workers)
+        self.buffer = bytearray()
+        # Blocks being compressed, written to the output in order
+        self.pending = deque()
+
+    def set_level(self, level):
+        """Compress the next data at another level, 0 to store it"""
+        if level != self.level:
+            self.submit_block()
+            self.level = level
+
+    def write(self, data):
+        """Add data to the archive"""
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self.submit_block()
+
+    def submit_block(self):
+        """Compress the next block in the background"""
+        if len(self.buffer) == 0:
+            return
+        block = bytes(self.buffer[: self.block_size])
+        del self.buffer[: self.block_size]
+        self.pending.append(self.executor.submit(compress, block, self.level, mtime=0))
+        # A few blocks at most are kept in memory
+        while len(self.pending) > self.workers * 2:
+            self.output.write(self.pending.popleft().result())
+
+    def close(self):
+        """Write the last blocks"""
+        while len(self.buffer) > 0:
+            self.submit_block()
+        while len(self.pending) > 0:
+            self.output.write(self.pending.popleft().result())
+        self.executor.shutdown()
+        self.output.flush()
+
+
+class TarWriter:
+    """Tar archive written member by member to a ParallelGzipWriter"""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def add(self, name, file, size, modified, compressed=False):
+        """Add a member from an opened binary file of a known size"""
+        tar_info = TarInfo(name)
+        tar_info.size = size
+        tar_info.mtime = int(modified)
+        self.writer.set_level(EXPORT_COMPRESS_LEVEL)
+        self.writer.write(tar_info.tobuf(GNU_FORMAT))
+
+        self.writer.set_level(0 if compressed else EXPORT_COMPRESS_LEVEL)
+        copy_file(file, self.writer, size)
+        self.writer.set_level(EXPORT_COMPRESS_LEVEL)
+        self.writer.write(b"\0" * (-size % TAR_BLOCK_SIZE))
+
+    def close(self):
+        """Write the end of the archive"""
+        self.writer.write(b"\0" * (TAR_BLOCK_SIZE * 2))
+        self.writer.close()
+
+
+class ZipWriter:
+    """Zip archive written member by member, the output can be a pipe"""
+
+    def __init__(self, output):
+        # Closed by close(), after all the members
+        self.zip_file = ZipFile(  # pylint: disable=consider-using-with
+            output, "w", allowZip64=True
+        )
+
+    def add(self, name, file, size, modified, compressed=False):
+        """Add a member from an opened binary file of a known size"""
+        zip_info = ZipInfo(name, localtime(max(modified, ZIP_MIN_TIME))[:6])
+        zip_info.external_attr = 0o644 << 16
+        zip_info.file_size = size
+        zip_info.compress_type = ZIP_STORED if compressed else ZIP_DEFLATED
+        with self.zip_file.open(zip_info, "w", force_zip64=True) as member:
+            copy_file(file, member, size)
+
+    def close(self):
+        """Write the directory of the archive"""
+        self.zip_file.close()
+
+
+def get_archive_name(file_path):
+    """Return the name of a file of the save folder in an archive"""
+    return path.relpath(file_path, SAVE_FOLDER).replace(path.sep, "/")
+
+
+def add_generated_file(archive, name, lines):
+    """Add a member written from lines of text, spilled to a temporary file if large"""
+    with SpooledTemporaryFile(EXPORT_BLOCK_SIZE) as temporary_file:
+        for line in lines:
+            temporary_file.write(line.encode("utf8"))
+        size = temporary_file.tell()
+        temporary_file.seek(0)
+        archive.add(name, temporary_file, size, time())
+
+
+def iter_entry_pages(collection):
+    """Yield the entries of a collection with their number, page by page"""
+    storage = get_storage()
+    count = storage.count(collection)
+    for start in range(0, count, EXPORT_PAGE_SIZE):
+        yield from enumerate(
+            storage.page(collection, start, start + EXPORT_PAGE_SIZE), start
+        )
+
+
+def list_image_paths(collection):
+    """Return the paths of the images of the entries of a collection, once each"""
+    # Ordered like the entries, the images of a blob are only exported once
+    image_paths = {}
+    for _, (image_names, _) in iter_entry_pages(collection):
+        for image_name in image_names:
+            if len(image_name) > 0:
+                image_paths[get_image_path(collection, image_name)] = None
+    return list(image_paths)
+
+
+def iter_entries_json(collection):
+    """Yield the parts of a JSON array of the entries of a collection"""
+    yield "["
+    for entry_number, entry in iter_entry_pages(collection):
+        yield ",\n" if entry_number > 0 else "\n"
+        yield dumps(format_json_entry(entry_number, entry), ensure_ascii=False)
+    yield "\n]\n"
+
+
+def export_collection(collection, output, archive_format="zip", entries=False):
+    """Write a collection to an archive in a binary file, return the number of images
+
+    With entries, a JSON file of the entries is added to the archive.
+    """
+    if archive_format == "zip":
+        archive = ZipWriter(output)
+    else:
+        archive = TarWriter(ParallelGzipWriter(output))
+
+    text_file = get_text_path(collection)
+    try:
+        with open(text_file, "rb") as opened_file:
+            file_stat = stat(text_file)
+            archive.add(
+                get_archive_name(text_file),
+                opened_file,
+                file_stat.st_size,
+                file_stat.st_mtime,
+            )
+    except FileNotFoundError:
+        # Entries stored in a database, written in the text file format
+        add_generated_file(
+            archive,
+            f"{collection}/{TEXT_FILE_NAME}",
+            (format_entry(*entry) for _, entry in iter_entry_pages(collection)),
+        )
+
+    if entries:
+        add_generated_file(
+            archive,
+            f"{collection}/{EXPORT_ENTRIES_FILE_NAME}",
+            iter_entries_json(collection),
+        )
+
+    image_count = 0
+    for image_path in list_image_paths(collection):
+        try:
+            with open(image_path, "rb") as opened_file:
+                file_stat = stat(image_path)
+                archive.add(
+                    get_archive_name(image_path),
+                    opened_file,
+                    file_stat.st_size,
+                    file_stat.st_mtime,
+                    compressed=True,
+                )
+            image_count += 1
+        except FileNotFoundError as error:
+            # The archive can be written to the standard output
+            print(f"Cannot export the image.\n{error}", file=sys.stderr)
+
+    archive.close()
+    return image_count
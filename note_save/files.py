@@ -1,8 +1,15 @@
 """Managing files and folders"""
 
-from os import listdir, makedirs, path, startfile
+from mmap import ACCESS_READ, mmap
+from os import listdir, makedirs, path
 
-from .configuration import VALID_FILE_NAME_CHARACTERS
+try:
+    from os import startfile
+except ImportError:
+    # Only on Windows, the other functions can be used without it
+    startfile = None
+
+from .configuration import IMAGE_EXTENSION, VALID_FILE_NAME_CHARACTERS
 
 
 def create_full_path(dir_path):
@@ -21,12 +28,12 @@ def list_files(dir_path):
 
 
 def list_folders(dir_path):
-    """Return a list of folders in a folder"""
+    """Return a list of folders in a folder, without the hidden ones"""
     if is_folder(dir_path):
         return [
             element
             for element in list_files(dir_path)
-            if is_folder(f"{dir_path}/{element}")
+            if not element.startswith(".") and is_folder(f"{dir_path}/{element}")
         ]
     return []
 
@@ -41,6 +48,25 @@ def is_folder(element_path):
     return path.isdir(element_path)
 
 
+def map_file(file_path):
+    """Return a read-only memory map of a file, None if it is missing or empty"""
+    try:
+        with open(file_path, "rb") as opened_file:
+            if path.getsize(file_path) == 0:
+                return None
+            # The map stays valid after the file is closed
+            return mmap(opened_file.fileno(), 0, access=ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+def get_image_file_name(image_name):
+    """Return the file name of an image, the names without extension use IMAGE_EXTENSION"""
+    if path.splitext(image_name)[1] == "":
+        return f"{image_name}{IMAGE_EXTENSION}"
+    return image_name
+
+
 def valid_file_name(text):
     """Return True if the text is a valid file name, False otherwise"""
     for char in text:
@@ -3,6 +3,7 @@
 import tkinter as tk
 from tkinter import TclError, messagebox, ttk
 
+from .catalog import invalidate_collections, list_collections
 from .configuration import (
     BANNER_BACKGROUND_COLOR,
     DEFAULT_COLLECTION_NAME,
@@ -12,7 +13,7 @@ from .configuration import (
     TEXT_COLOR,
     VALID_FILE_NAME_PATTERN,
 )
-from .files import create_full_path, list_folders, open_file_explorer, valid_file_name
+from .files import create_full_path, open_file_explorer, valid_file_name
 from .gui_frame import Frame
 
 
@@ -55,6 +56,14 @@ class BannerFrame(Frame):
         self.switch_ui_button = tk.Button(self.frame, command=self.event_switch_ui)
         self.switch_ui_button.pack(pady=DEFAULT_PADDING)
 
+        # Saves in progress
+        self.status_label = tk.Label(
+            self.frame,
+            bg=BANNER_BACKGROUND_COLOR,
+            fg=TEXT_COLOR,
+        )
+        self.status_label.pack()
+
         self.show()
 
     def show(self):
@@ -172,8 +181,8 @@ class BannerFrame(Frame):
         self.event_close_collection_window()
 
     def load_collections(self):
-        """Load the collections name list from the save folder"""
-        folders = list_folders(SAVE_FOLDER)
+        """Load the collections name list from the catalog"""
+        folders = list_collections()
         if DEFAULT_COLLECTION_NAME not in folders:
             folders = [DEFAULT_COLLECTION_NAME] + folders
         if len(folders) > 0:
@@ -193,6 +202,7 @@ class BannerFrame(Frame):
 
         # Create the directory
         create_full_path(f"{SAVE_FOLDER}/{collection}")
+        invalidate_collections()
         # Reload the collections
         self.load_collections()
         # Set the new collection
@@ -200,6 +210,13 @@ class BannerFrame(Frame):
         # Trigger the collection change event
         self.event_change_collection()
 
+    def set_pending_saves(self, pending):
+        """Display the number of saves in progress or nothing"""
+        self.status_label.config(
+            text=f"Saving {pending} entr{'ies' if pending > 1 else 'y'}..."
+            * (pending > 0)
+        )
+
     def set_switch_ui_text(self, text):
         """Set the Switch UI label text"""
         self.switch_ui_button.config(text=text)
@@ -1,26 +1,33 @@
 """Explorer GUI"""
 
 import tkinter as tk
-from math import ceil
-from threading import Thread
-from tkinter import TclError
+from array import array
+from bisect import bisect_right
 
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 from .configuration import (
     DEFAULT_PADDING,
-    EXPLORER_MAX_LINES_BY_PAGE,
-    IMAGE_EXTENSION,
+    EXPLORER_FOLLOW_DELAY,
+    EXPLORER_SCROLL_HEIGHT,
+    EXPLORER_SCROLL_OVERSCAN,
+    EXPLORER_SCROLL_ROW_HEIGHT,
+    EXPLORER_SCROLL_WIDTH,
+    EXPLORER_SEARCH_DELAY,
     MAX_PREVIEW_IMAGE_SIZE,
     PREVIEW_IMAGES_BY_LINE,
     PRIMARY_BACKGROUND_COLOR,
-    SAVE_FOLDER,
     SECONDARY_BACKGROUND_COLOR,
     TEXT_COLOR,
 )
 from .files import open_file
 from .gui_frame import Frame
-from .load import load
+from .layout import PageLayout, ReversedLayout
+from .scheduler import Priority
+from .search import load_search_index, search
+from .storage import get_storage, restore_image
+from .thumbnails import evict_thumbnails, get_thumbnail
+from .tracing import span, traced
 
 
 class ExplorerFrame(Frame):
@@ -33,13 +40,22 @@ class ExplorerFrame(Frame):
 
         self.collection = self.app.get_collection()
 
+        # Number of images of all the entries, read again only when appended
+        self.image_counts = []
+        self.follow_cursor = None
+        self.follow_after_id = None
+
         self.collection_content = []
         self.collection_page = 0
-        self.pages_media_length = []
+        self.layout = PageLayout()
 
         self.content_cache = []
 
         self.reverse = tk.IntVar()
+        self.scroll = tk.IntVar()
+
+        self.search_query = ""
+        self.search_after_id = None
 
         self.showing = False
 
@@ -89,25 +105,67 @@ class ExplorerFrame(Frame):
         )
         self.reverse_checkbutton.grid(row=1, column=5, padx=DEFAULT_PADDING)
 
+        # Continuous scrolling checkbox
+        self.scroll_checkbutton = tk.Checkbutton(
+            self.controls_frame,
+            text="Scroll",
+            variable=self.scroll,
+            command=self.event_scroll,
+        )
+        self.scroll_checkbutton.grid(row=1, column=6, padx=DEFAULT_PADDING)
+
+        # Search field
+        tk.Label(
+            self.controls_frame,
+            text="Search",
+            bg=PRIMARY_BACKGROUND_COLOR,
+            fg=TEXT_COLOR,
+        ).grid(row=0, column=7)
+
+        self.search_entry = tk.Entry(self.controls_frame)
+        self.search_entry.grid(row=1, column=7, padx=DEFAULT_PADDING)
+        self.search_entry.bind("<KeyRelease>", self.event_search_typing)
+        self.search_entry.bind("<Return>", self.event_search)
+        self.search_entry.bind("<<Paste>>", self.event_search_paste)
+
         # Content container
         self.content_container = tk.Frame(self.frame)
         self.content_container.pack(fill=tk.BOTH, expand=True)
 
+        # Content container in continuous scrolling mode
+        self.scroll_view = ScrollView(self.frame, self)
+
         self.show()
 
     def show(self):
         self.showing = True
         self.frame.pack(fill=tk.BOTH, expand=True)
+        if self.follow_after_id is None:
+            self.follow_after_id = self.frame.after(
+                EXPLORER_FOLLOW_DELAY, self.event_follow
+            )
 
     def hide(self):
         self.showing = False
         self.frame.pack_forget()
+        if self.follow_after_id is not None:
+            self.frame.after_cancel(self.follow_after_id)
+            self.follow_after_id = None
+
+    def event_follow(self):
+        """Display the entries saved by other processes"""
+        self.follow_after_id = self.frame.after(
+            EXPLORER_FOLLOW_DELAY, self.event_follow
+        )
+        self.update_refresh()
 
     def set_collection(self, collection):
         """Set the actual collection"""
         if collection != self.collection:
             self.collection_page = 0
             self.collection = collection
+            self.image_counts = []
+            self.follow_cursor = None
             self.full_refresh()
 
     def first_page(self):
@@ -142,6 +200,17 @@ class ExplorerFrame(Frame):
 
     def previous_next_buttons_state(self):
         """Enable or disable the previous and next buttons"""
+        if self.scroll.get():
+            # No pages in continuous scrolling mode
+            for button in (
+                self.first_page_button,
+                self.previous_page_button,
+                self.next_page_button,
+                self.last_page_button,
+            ):
+                button.config(state=tk.DISABLED)
+            return
+
         if self.collection_page > 0:
             self.previous_page_button.config(state=tk.NORMAL)
             self.first_page_button.config(state=tk.NORMAL)
@@ -156,66 +225,124 @@ class ExplorerFrame(Frame):
             self.next_page_button.config(state=tk.DISABLED)
             self.last_page_button.config(state=tk.DISABLED)
 
-    def get_pages_media_number(self):
-        """Get the number of medias for each page and line"""
-        self.pages_media_length = []
-        page = []
-        lines_in_page = 0
-        lines = []
-        line = []
-
-        # list[tuple[list[str], str]] [(file names, text) ...]
-        for content in self.collection_content:
-            # Get the number of medias in the content, 1 by default for the text
-            media_length = max(1, len(content[0]))
-
-            if sum(line) + media_length <= PREVIEW_IMAGES_BY_LINE:
-                # The media length can be added to the page
-                line.append(media_length)
-            else:
-                # The line is full, add it to the list
-                lines.append(line)
-                line = [media_length]
-
-        # Add the rest
-        if len(line) > 0:
-            lines.append(line)
-
-        for line in lines:
-            # If line contains more than PREVIEW_IMAGES_BY_LINE medias, it will take multiple lines
-            line_and_overflow = ceil(sum(line) / PREVIEW_IMAGES_BY_LINE)
-
-            if lines_in_page + line_and_overflow <= EXPLORER_MAX_LINES_BY_PAGE:
-                # The line can be added to the page
-                page.append(line)
-                lines_in_page += line_and_overflow
-            else:
-                # The page is full, add it to the list
-                self.pages_media_length.append(page)
-                page = [line]
-                lines_in_page = line_and_overflow
-
-        # Add the rest
-        if len(page) > 0:
-            self.pages_media_length.append(page)
+    @traced("ExplorerFrame.get_layout", "layout")
+    def get_layout(self):
+        """Place the entries in lines and pages"""
+        if self.scroll.get():
+            # Each page is a row of the scroll view
+            self.layout = PageLayout(lines_by_page=1)
+        else:
+            self.layout = PageLayout()
+        # list[tuple[int, int]] [(entry number, number of images) ...]
+        self.layout.extend(image_count for _, image_count in self.collection_content)
+        if not self.reverse.get():
+            # Newest first, the entries are still placed in the saved order
+            self.layout = ReversedLayout(self.layout)
+
+    def get_content(self, starting_index, ending_index):
+        """Return the collection content between two indexes of the layout"""
+        if not isinstance(self.layout, ReversedLayout):
+            return self.collection_content[starting_index:ending_index]
+        # Newest first, the indexes are counted from the last entry
+        count = len(self.collection_content)
+        content = self.collection_content[count - ending_index : count - starting_index]
+        return content[::-1]
 
     def page_count(self):
         """Get the number of pages"""
-        return len(self.pages_media_length)
+        return self.layout.page_count()
 
     def event_reverse(self, event=None):
         """Reverse the collection"""
         del event
         self.full_refresh()
 
+    def event_scroll(self, event=None):
+        """Switch between pages and continuous scrolling"""
+        del event
+        # The images of the previous mode are not needed anymore
+        self.app.scheduler.cancel_group(self)
+        if self.scroll.get():
+            for widget in self.content_container.winfo_children():
+                widget.destroy()
+            self.content_cache = []
+            self.content_container.pack_forget()
+            self.scroll_view.show()
+        else:
+            self.scroll_view.clear()
+            self.scroll_view.hide()
+            self.content_container.pack(fill=tk.BOTH, expand=True)
+        self.collection_page = 0
+        self.full_refresh()
+
+    def event_search_typing(self, event=None):
+        """Search once the user stops typing"""
+        del event
+        if self.search_after_id is not None:
+            self.frame.after_cancel(self.search_after_id)
+        self.search_after_id = self.frame.after(
+            EXPLORER_SEARCH_DELAY, self.event_search
+        )
+
+    def event_search_paste(self, event=None):
+        """Paste text in the search field without adding the images to the inputs"""
+        del event
+        try:
+            self.search_entry.insert(tk.INSERT, self.frame.clipboard_get())
+        except tk.TclError:
+            pass
+        self.event_search_typing()
+        return "break"
+
+    def event_search(self, event=None):
+        """Show the entries matching the search field"""
+        del event
+        if self.search_after_id is not None:
+            self.frame.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        search_query = self.search_entry.get().strip()
+        if search_query != self.search_query:
+            self.search_query = search_query
+            self.collection_page = 0
+            self.full_refresh()
+        # Do not save the inputs
+        return "break"
+
     def full_refresh(self):
         """Load collection content and refresh"""
         if self.showing:
             self.get_collection_content()
             self.refresh()
 
-    def refresh(self):
+    def update_refresh(self):
+        """Add the entries appended since the last read and refresh if there are some"""
+        if not self.showing:
+            return
+        if self.follow_cursor is None:
+            # First read of the collection
+            self.full_refresh()
+            return
+        new_content = self.follow_collection()
+        if new_content is None:
+            # The collection was rewritten
+            self.get_collection_content()
+            self.refresh()
+        elif len(new_content) > 0:
+            self.merge_collection_content(new_content)
+            self.refresh(keep_position=True)
+
+    def refresh(self, keep_position=False):
         """Refresh the frame content"""
+        if self.scroll.get():
+            if keep_position:
+                self.scroll_view.update()
+            else:
+                self.scroll_view.reset()
+            self.page_label.config(text="-")
+            self.previous_next_buttons_state()
+            self.app.resize()
+            return
+
         self.display_collection_content()
 
         self.page_label.config(
@@ -223,19 +350,77 @@ class ExplorerFrame(Frame):
         )
         self.previous_next_buttons_state()
 
+    def follow_collection(self):
+        """Read the entries appended since the last read
+
+        Return the new (entry number, number of images), None if all the
+        entries were read again.
+        """
+        # Only the numbers of the entries and of their images are read,
+        # the entries are loaded page by page
+        self.follow_cursor, image_counts, start = get_storage().follow(
+            self.collection, self.follow_cursor
+        )
+        if start != len(self.image_counts):
+            self.image_counts = image_counts
+            return None
+        self.image_counts.extend(image_counts)
+        return list(enumerate(image_counts, start))
+
+    def merge_collection_content(self, new_content):
+        """Add appended entries to the collection content and to the layout"""
+        if len(self.search_query) > 0:
+            matching_entry_numbers = set(search(self.collection, self.search_query))
+            new_content = [
+                entry for entry in new_content if entry[0] in matching_entry_numbers
+            ]
+        # In the saved order, the new entries are placed after the others
+        self.collection_content.extend(new_content)
+        self.layout.extend(image_count for _, image_count in new_content)
+
     def get_collection_content(self):
         """Get the collection content data"""
-        self.collection_content = load(self.collection)
-        if not self.reverse.get():
-            self.collection_content.reverse()
-        self.get_pages_media_number()
+        self.follow_collection()
+        self.collection_content = list(enumerate(self.image_counts))
+        self.app.scheduler.submit(
+            evict_thumbnails, self.collection, priority=Priority.INDEXING
+        )
+        if len(self.search_query) > 0:
+            # Only the entries containing all the words of the search
+            self.collection_content = [
+                self.collection_content[entry_number]
+                for entry_number in search(self.collection, self.search_query)
+                if entry_number < len(self.collection_content)
+            ]
+        else:
+            # Prepare the search index before the first search
+            self.app.scheduler.submit(
+                load_search_index, self.collection, priority=Priority.INDEXING
+            )
+        self.get_layout()
         if self.collection_page + 1 > self.page_count():
             self.collection_page = self.page_count() - 1
             self.previous_next_buttons_state()
 
+    def prefetch_page(self, page):
+        """Create the thumbnails of a page in the background before it is displayed"""
+        if page < 0 or page >= self.page_count():
+            return
+        starting_index, ending_index = self.layout.page_range(page)
+        self.app.scheduler.submit(
+            prefetch_thumbnails,
+            self.collection,
+            get_entry_numbers(self.get_content(starting_index, ending_index)),
+            priority=Priority.PREFETCH,
+            group=self,
+        )
+
     def display_collection_content(self):
         """Display the collection content in the frame"""
 
+        # The images of the previous page are not needed anymore
+        self.app.scheduler.cancel_group(self)
+
         # Reset the cache
         self.content_cache = []
 
@@ -246,37 +431,20 @@ class ExplorerFrame(Frame):
         # Empty element to reset size
         tk.Frame(self.content_container, width=0, height=0).pack()
 
-        # Find the index of the first element in the page
-        starting_index = 0
-        for page_index in range(0, self.collection_page):
-            starting_index += sum([len(l) for l in self.pages_media_length[page_index]])
-
         # Display the content
         if len(self.collection_content) > 0:
-            for content_index in range(
-                starting_index,
-                starting_index
-                + sum([len(l) for l in self.pages_media_length[self.collection_page]]),
-            ):
-                grid_x = None
-                # grid_y = None
-                columns = None
-
-                # Find the location on the grid with the index
-                index_in_grid = 0
-                for line in range(len(self.pages_media_length[self.collection_page])):
-                    for column in range(
-                        len(self.pages_media_length[self.collection_page][line])
-                    ):
-                        if index_in_grid == content_index - starting_index:
-                            columns = self.pages_media_length[self.collection_page][
-                                line
-                            ][column]
-                            grid_x = column
-                            # grid_y = line
-                        index_in_grid += 1
-
-                saved_element = self.collection_content[content_index]
+            # Find the indexes of the elements in the page
+            starting_index, ending_index = self.layout.page_range(self.collection_page)
+            page_content = get_storage().get(
+                self.collection,
+                get_entry_numbers(self.get_content(starting_index, ending_index)),
+            )
+
+            for content_index in range(starting_index, ending_index):
+                # Location on the grid
+                _, grid_x, columns = self.layout.position(content_index)
+
+                saved_element = page_content[content_index - starting_index]
 
                 if len(saved_element) == 2:
                     # Names of the images
@@ -302,18 +470,292 @@ class ExplorerFrame(Frame):
                             saved_element_image_names,
                             saved_element_text,
                             self.collection,
-                            self.app.add_to_clipboard,
+                            self.app,
+                            self,
                             grid_x,
                             0,
                             columns,
                         ),
                     )
 
+        # Prepare the next page while the user is looking at this one
+        self.prefetch_page(self.collection_page + 1)
+
         self.app.resize()
 
 
+def get_entry_numbers(collection_content):
+    """Return the numbers of the entries of a part of the collection content"""
+    return [entry_number for entry_number, _ in collection_content]
+
+
+def prefetch_thumbnails(collection, entry_numbers):
+    """Create the thumbnails of the entries with the given numbers"""
+    for image_names, _ in get_storage().get(collection, entry_numbers):
+        for image_name in image_names:
+            if len(image_name) > 0:
+                get_thumbnail(collection, restore_image(collection, image_name))
+
+
+class ScrollRow:
+    """A row of the scroll view, its content frames are reused for other entries"""
+
+    def __init__(self, canvas, resize_function):
+        self.canvas = canvas
+        self.frame = tk.Frame(canvas, bg=PRIMARY_BACKGROUND_COLOR)
+        self.frame.grid_anchor(tk.N)
+        self.window = canvas.create_window(0, 0, window=self.frame, anchor=tk.NW)
+        # The height follows the content, the images are displayed after the text
+        self.frame.bind("<Configure>", lambda _: resize_function(self))
+
+        # Index of the displayed row, None when the row is free
+        self.index = None
+        # Instances of the ContentFrame class
+        self.content_frames = []
+
+    def show(self, index, y, width):
+        """Show the row at a position of the canvas"""
+        self.index = index
+        self.move(y)
+        self.canvas.itemconfig(self.window, width=width, state=tk.NORMAL)
+
+    def move(self, y):
+        """Move the row to another position of the canvas"""
+        self.canvas.coords(self.window, 0, y)
+
+    def hide(self):
+        """Hide the row"""
+        self.index = None
+        self.canvas.itemconfig(self.window, state=tk.HIDDEN)
+
+
+class ScrollView:
+    """Continuous scrolling of the entries
+
+    Only the rows in or near the viewport have widgets, the rows leaving it
+    are kept in a pool and reused for the rows entering it.
+    """
+
+    def __init__(self, parent, explorer):
+        self.explorer = explorer
+        self.app = explorer.app
+
+        self.frame = tk.Frame(parent, bg=PRIMARY_BACKGROUND_COLOR)
+
+        self.canvas = tk.Canvas(
+            self.frame,
+            width=EXPLORER_SCROLL_WIDTH,
+            height=EXPLORER_SCROLL_HEIGHT,
+            bg=PRIMARY_BACKGROUND_COLOR,
+            highlightthickness=0,
+            yscrollincrement=EXPLORER_SCROLL_ROW_HEIGHT // 4,
+        )
+        self.scrollbar = tk.Scrollbar(
+            self.frame, orient=tk.VERTICAL, command=self.event_scrollbar
+        )
+        self.canvas.config(yscrollcommand=self.scrollbar.set)
+
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", self.event_configure)
+        self.canvas.bind_all("<MouseWheel>", self.event_mouse_wheel, add=True)
+
+        # Displayed rows by index and rows ready to be reused
+        self.rows = {}
+        self.free_rows = []
+        # Top of each row in pixels, then the height of all the rows, measured
+        # when a row is displayed and estimated from its lines before
+        self.row_offsets = array("I", [0])
+        # Measured height of the rows by numbers of their first and last entries
+        self.row_heights = {}
+
+    def show(self):
+        """Show the scroll view"""
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+    def hide(self):
+        """Hide the scroll view"""
+        self.frame.pack_forget()
+
+    def event_scrollbar(self, *args):
+        """Scroll with the scrollbar"""
+        self.canvas.yview(*args)
+        self.update_rows()
+
+    def event_mouse_wheel(self, event):
+        """Scroll with the mouse wheel"""
+        # The event is received by all the widgets of the application
+        if not self.canvas.winfo_ismapped():
+            return
+        self.canvas.yview_scroll(int(-event.delta / 120), "units")
+        self.update_rows()
+
+    def event_configure(self, event):
+        """Adapt the rows to the size of the canvas"""
+        for row in self.rows.values():
+            self.canvas.itemconfig(row.window, width=event.width)
+        self.update_rows()
+
+    def clear(self):
+        """Release all the rows"""
+        for row_index in list(self.rows):
+            self.release_row(row_index)
+
+    def reset(self):
+        """Display the content of the explorer from the top"""
+        self.canvas.yview_moveto(0)
+        self.row_heights = {}
+        self.update()
+
+    def update(self):
+        """Display the content of the explorer at the same scroll position"""
+        self.clear()
+
+        # The rows keep their measured height if their entries did not change
+        layout = self.explorer.layout
+        self.row_offsets = array("I", [0])
+        for row_index in range(layout.page_count()):
+            height = self.row_heights.get(
+                self.get_row_entries(row_index),
+                layout.page_height(row_index) * EXPLORER_SCROLL_ROW_HEIGHT,
+            )
+            self.row_offsets.append(self.row_offsets[-1] + height)
+        self.update_scroll_region()
+        self.update_rows()
+
+    def update_scroll_region(self):
+        """Adapt the scrollable area to the height of the rows"""
+        self.canvas.config(
+            scrollregion=(0, 0, EXPLORER_SCROLL_WIDTH, self.row_offsets[-1])
+        )
+
+    def get_row_entries(self, row_index):
+        """Return the numbers of the first and the last entries of a row"""
+        content = self.explorer.get_content(*self.explorer.layout.page_range(row_index))
+        return content[0][0], content[-1][0]
+
+    def row_at(self, y):
+        """Return the index of the row at a position of the canvas"""
+        return min(
+            len(self.row_offsets) - 2, max(0, bisect_right(self.row_offsets, y) - 1)
+        )
+
+    def event_row_resize(self, row):
+        """Move the next rows when the content of a row changed its height"""
+        if row.index is not None:
+            self.set_row_height(row.index, row.frame.winfo_reqheight())
+            self.update_rows()
+
+    def set_row_height(self, row_index, height):
+        """Set the measured height of a row and move the next rows"""
+        self.row_heights[self.get_row_entries(row_index)] = height
+        difference = height - (
+            self.row_offsets[row_index + 1] - self.row_offsets[row_index]
+        )
+        if difference == 0:
+            return
+        top = self.canvas.canvasy(0)
+        above_viewport = 0 < self.row_offsets[row_index + 1] <= top
+
+        for index in range(row_index + 1, len(self.row_offsets)):
+            self.row_offsets[index] += difference
+        for index, row in self.rows.items():
+            if index > row_index:
+                row.move(self.row_offsets[index])
+        self.update_scroll_region()
+
+        if above_viewport:
+            # Keep the displayed entries in place
+            self.canvas.yview_moveto((top + difference) / self.row_offsets[-1])
+
+    def update_rows(self):
+        """Display the rows in or near the viewport and release the others"""
+        layout = self.explorer.layout
+        if layout.page_count() == 0:
+            return
+
+        # In the scroll view, each page of the layout is a row, the measured
+        # heights of the displayed rows can bring other rows in the viewport
+        displayed = True
+        while displayed:
+            top = self.canvas.canvasy(0)
+            bottom = top + self.canvas.winfo_height()
+            first_row = max(0, self.row_at(top) - EXPLORER_SCROLL_OVERSCAN)
+            last_row = min(
+                layout.page_count() - 1, self.row_at(bottom) + EXPLORER_SCROLL_OVERSCAN
+            )
+
+            for row_index in list(self.rows):
+                if not first_row <= row_index <= last_row:
+                    self.release_row(row_index)
+
+            displayed = False
+            for row_index in range(first_row, last_row + 1):
+                if row_index not in self.rows:
+                    self.display_row(row_index)
+                    displayed = True
+
+    def display_row(self, row_index):
+        """Display a row with a free or a new row"""
+        row = (
+            self.free_rows.pop()
+            if len(self.free_rows) > 0
+            else ScrollRow(self.canvas, self.event_row_resize)
+        )
+        self.rows[row_index] = row
+
+        layout = self.explorer.layout
+        collection = self.explorer.collection
+        starting_index, ending_index = layout.page_range(row_index)
+        entries = get_storage().get(
+            collection,
+            get_entry_numbers(self.explorer.get_content(starting_index, ending_index)),
+        )
+
+        for index, (image_names, text) in enumerate(entries):
+            _, grid_x, columns = layout.position(starting_index + index)
+            image_names = [
+                image_name for image_name in image_names if len(image_name) > 0
+            ]
+            if index < len(row.content_frames):
+                # Reuse the widgets
+                row.content_frames[index].set_content(
+                    image_names, text, collection, grid_x, columns
+                )
+            else:
+                row.content_frames.append(
+                    ContentFrame(
+                        row.frame,
+                        image_names,
+                        text,
+                        collection,
+                        self.app,
+                        row,
+                        grid_x,
+                        0,
+                        columns,
+                    )
+                )
+        for content_frame in row.content_frames[len(entries) :]:
+            content_frame.hide()
+
+        row.show(row_index, self.row_offsets[row_index], self.canvas.winfo_width())
+        # Measured now, a reused row may keep its height and not be configured
+        row.frame.update_idletasks()
+        self.set_row_height(row_index, row.frame.winfo_reqheight())
+
+    def release_row(self, row_index):
+        """Hide a row and keep it to be reused"""
+        row = self.rows.pop(row_index)
+        # The images of the row are not needed anymore
+        self.app.scheduler.cancel_group(row)
+        row.hide()
+        self.free_rows.append(row)
+
+
 class ContentFrame:
-    """A content container"""
+    """A content container, its widgets can be reused for another content"""
 
     def __init__(
         self,
@@ -321,26 +763,37 @@ class ContentFrame:
         image_names,
         text,
         collection,
-        add_clipboard_function,
+        app,
+        task_group,
         grid_x,
         grid_y,
         columns,
     ):
         self.parent = parent
-        self.image_names = image_names
-        self.text = text
-        self.collection = collection
 
         # Function to add content to the clipboard
-        self.add_clipboard_function = add_clipboard_function
+        self.add_clipboard_function = app.add_to_clipboard
+
+        # Images are loaded by the workers and displayed by the Tk thread
+        self.scheduler = app.scheduler
+        self.render_queue = app.render_queue
+        self.task_group = task_group
 
         # Grid position
-        self.grid_x = grid_x
         self.grid_y = grid_y
 
+        # Content, set by set_content
+        self.image_names = []
+        self.text = ""
+        self.collection = collection
+        self.grid_x = grid_x
         self.columns = columns
+        # Images loaded for a previous content are not displayed
+        self.content_version = 0
 
         self.image_cache = []
+        # Buttons of the images by index, kept to be reused
+        self.image_buttons = {}
 
         # Create a container for the label and images
         self.frame = tk.Frame(
@@ -352,77 +805,105 @@ class ContentFrame:
             pady=DEFAULT_PADDING,
         )
 
-        # Display the text
-        if len(self.text) > 0:
-            copy_button = tk.Button(
-                self.frame,
-                text="Copy",
-                command=lambda: add_clipboard_function(self.text),
-            )
-            copy_button.pack()
-
-            text_label = tk.Label(
-                self.frame,
-                bg=SECONDARY_BACKGROUND_COLOR,
-                fg=TEXT_COLOR,
-                text=self.text,
-                wraplength=MAX_PREVIEW_IMAGE_SIZE * self.columns,
-            )
-            text_label.pack()
+        # Text
+        self.copy_button = tk.Button(
+            self.frame,
+            text="Copy",
+            command=lambda: self.add_clipboard_function(self.text),
+        )
+        self.text_label = tk.Label(
+            self.frame,
+            bg=SECONDARY_BACKGROUND_COLOR,
+            fg=TEXT_COLOR,
+        )
 
-        # Display the images
+        # Images
         self.image_container = tk.Frame(
             self.frame,
             bg=SECONDARY_BACKGROUND_COLOR,
         )
 
-        self.image_container.pack()
+        self.set_content(image_names, text, collection, grid_x, columns)
+
+    def set_content(self, image_names, text, collection, grid_x, columns):
+        """Display a content in the frame"""
+        self.image_names = image_names
+        self.text = text
+        self.collection = collection
+        self.grid_x = grid_x
+        self.columns = columns
+        self.content_version += 1
 
-        # Index of the image in the list of images for grid placement
-        index = 0
+        # Display the text
+        self.copy_button.pack_forget()
+        self.text_label.pack_forget()
+        self.image_container.pack_forget()
+        if len(self.text) > 0:
+            self.copy_button.pack()
+            self.text_label.config(
+                text=self.text, wraplength=MAX_PREVIEW_IMAGE_SIZE * self.columns
+            )
+            self.text_label.pack()
 
-        for image_name in self.image_names:
-            image_path = f"{SAVE_FOLDER}/{collection}/{image_name}{IMAGE_EXTENSION}"
-            # self.load_image(image_path, index)
-            Thread(target=self.load_image, args=(image_path, index)).start()
+        # Display the images
+        self.image_container.pack()
 
-            index += 1
+        self.image_cache = []
+        for button_image in self.image_buttons.values():
+            button_image.grid_forget()
+
+        for index, image_name in enumerate(self.image_names):
+            self.scheduler.submit(
+                self.load_image,
+                collection,
+                image_name,
+                index,
+                self.content_version,
+                priority=Priority.VISIBLE,
+                group=self.task_group,
+            )
 
         self.show()
 
-    def load_image(self, image_path, index):
-        """Load an image in the frame"""
-        try:
-            image = Image.open(image_path)
-        except FileNotFoundError:
+    def load_image(self, collection, image_name, index, content_version):
+        """Load an image for the frame (in a worker thread)"""
+        # A missing file is written again from the database if it has a copy
+        image_path = restore_image(collection, image_name)
+        # Only the cached thumbnail is decoded, not the full size image
+        thumbnail = get_thumbnail(collection, image_path)
+        if thumbnail is None:
             return
 
-        # Resize the image with the size limit (keeping ratio)
-        image_width = image.width
-        image_height = image.height
-        if image_width > image_height:
-            resize_width = MAX_PREVIEW_IMAGE_SIZE
-            resize_height = int(image_height / (image_width / MAX_PREVIEW_IMAGE_SIZE))
-        else:
-            resize_height = MAX_PREVIEW_IMAGE_SIZE
-            resize_width = int(image_width / (image_height / MAX_PREVIEW_IMAGE_SIZE))
-        image_resized = image.resize((resize_width, resize_height), Image.ANTIALIAS)
+        # Tk is not thread-safe, the display is done by the Tk thread
+        self.render_queue.post(
+            self.display_image, thumbnail, image_path, index, content_version
+        )
+
+    def display_image(self, thumbnail, image_path, index, content_version):
+        """Display a loaded image in the frame (in the Tk thread)"""
+        # The page or the content may have changed since the image was loaded
+        if content_version != self.content_version or not self.frame.winfo_exists():
+            return
 
         # Convert the image for Tkinter
-        display_image = ImageTk.PhotoImage(image_resized)
+        with span("ImageTk.PhotoImage", "image"):
+            display_image = ImageTk.PhotoImage(thumbnail)
 
         # Display the image
-        try:
-            self.create_open_button(display_image, image_path, index)
-        except TclError:
-            return
+        self.create_open_button(display_image, image_path, index)
         self.image_cache.append(display_image)
 
     def create_open_button(self, image, path, index):
-        """Create button to preview and open the image"""
-        button_image = tk.Button(
-            self.image_container, image=image, command=lambda: open_file(path)
-        )
+        """Create or reuse a button to preview and open the image"""
+        # The images are loaded in any order, each index keeps its button
+        button_image = self.image_buttons.get(index)
+        if button_image is not None:
+            button_image.config(image=image, command=lambda: open_file(path))
+        else:
+            button_image = tk.Button(
+                self.image_container, image=image, command=lambda: open_file(path)
+            )
+            self.image_buttons[index] = button_image
         button_image.grid(
             row=index // PREVIEW_IMAGES_BY_LINE + 1,
             column=index % PREVIEW_IMAGES_BY_LINE,
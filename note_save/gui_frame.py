@@ -1,9 +1,16 @@
 """Abstract class for application frames"""
 
+from .tracing import trace_methods
+
 
 class Frame:
     """Frame"""
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Time the event handlers of the frames when tracing is enabled
+        trace_methods(cls, "event_")
+
     def __init__(self, window, app):
         pass
 
@@ -3,12 +3,8 @@
 import tkinter as tk
 from tkinter import scrolledtext
 
-from PIL import Image, ImageTk
-
-from .clipboard_image import get_clipboard_images
 from .configuration import (
     DEFAULT_PADDING,
-    MAX_PREVIEW_IMAGE_SIZE,
     PREVIEW_IMAGES_BY_LINE,
     PRIMARY_BACKGROUND_COLOR,
     SECONDARY_BACKGROUND_COLOR,
@@ -16,7 +12,7 @@ from .configuration import (
     TEXT_LINE_HEIGHT,
 )
 from .gui_frame import Frame
-from .save import save
+from .tracing import span
 
 
 class InputFrame(Frame):
@@ -31,7 +27,7 @@ class InputFrame(Frame):
         self.frame.bind_all("<Return>", self.event_save)
         self.frame.bind_all("<Shift-Return>", self.event_enter)
 
-        # Attachments
+        # Attachments, instances of the StagedImage class
         self.images = []
         # Instances of the ImageFrame class
         self.image_cache = []
@@ -46,6 +42,12 @@ class InputFrame(Frame):
         )
         self.images_label.pack(anchor=tk.NW, padx=DEFAULT_PADDING, pady=DEFAULT_PADDING)
 
+        # Images refused or downscaled by the last paste
+        self.notice_label = tk.Label(
+            self.frame, bg=PRIMARY_BACKGROUND_COLOR, fg=TEXT_COLOR, justify=tk.LEFT
+        )
+        self.notice_label.pack(anchor=tk.NW, padx=DEFAULT_PADDING)
+
         self.image_container = tk.Frame(self.frame, bg=SECONDARY_BACKGROUND_COLOR)
         self.image_container.pack(
             fill=tk.BOTH,
@@ -121,12 +123,43 @@ class InputFrame(Frame):
         """Something is pasted in the window"""
         del event
         if not self.app.get_ignore_events():
+            # PIL is imported on the first paste, not to open the window
+            from .clipboard_image import (  # pylint: disable=import-outside-toplevel
+                get_clipboard_images,
+            )
+            from .staging import (  # pylint: disable=import-outside-toplevel
+                StagedImage,
+            )
+
             # If it is images, add them to the list of images
-            self.images += get_clipboard_images()
+            images, messages = get_clipboard_images()
+            for image in images:
+                staged_image = StagedImage(image)
+                # Encoded in the background, the pixels are not kept until the save
+                if staged_image.preview is None:
+                    self.app.scheduler.submit(self.prepare_image, staged_image)
+                else:
+                    self.app.scheduler.submit(staged_image.stage)
+                self.images.append(staged_image)
+            if len(images) > 0 or len(messages) > 0:
+                self.notice_label.config(text="\n".join(messages))
             if len(self.images) > 0:
                 # Update the images on the screen
                 self.image_update()
 
+    def prepare_image(self, staged_image):
+        """Compute the preview of a large image then encode it (in a worker thread)"""
+        staged_image.get_preview()
+        # Tk is not thread-safe, the display is done by the Tk thread
+        self.app.render_queue.post(self.event_preview, staged_image)
+        staged_image.stage()
+
+    def event_preview(self, staged_image):
+        """Display the preview of a large image once it is computed"""
+        for image_frame in self.image_cache:
+            if image_frame.image is staged_image:
+                image_frame.display_preview()
+
     def event_enter(self, event=None):
         """New line in text or save images"""
         del event
@@ -142,16 +175,25 @@ class InputFrame(Frame):
         if not self.app.get_ignore_events():
             # Set the text variable to the input text
             self.get_text()
-            # Saving
-            saved = False
+            # Saving in the background
             if not self.is_text_empty() or len(self.images) > 0:
-                saved = save(self.collection, self.text, self.images)
-            # Reset the inputs
-            if saved:
+                self.app.save(self.collection, self.text, list(self.images))
+                # Reset the inputs
                 self.reset_inputs(True)
 
+    def restore_inputs(self, text, images):
+        """Put back the inputs of a failed save before the current ones"""
+        if len(text) > 0:
+            self.get_text()
+            self.textbox.insert("1.0", text + "\n" * (not self.is_text_empty()))
+            self.get_text()
+        if len(images) > 0:
+            self.images = list(images) + self.images
+            self.image_update()
+
     def reset_inputs(self, full=False):
         """Reset the inputs by steps or reset everything"""
+        self.notice_label.config(text="")
         if full:
             # Clear everything
             self.images = []
@@ -159,6 +201,8 @@ class InputFrame(Frame):
             self.clear_text()
         elif len(self.images) > 0:
             # Clear the images first if there are any
+            for image in self.images:
+                image.discard()
             self.images = []
             self.image_update()
         else:
@@ -175,6 +219,7 @@ class InputFrame(Frame):
     def delete_image(self, image, image_frame=None):
         """Delete an image from the list of images and update the label on the screen"""
         self.images.remove(image)
+        image.discard()
         # Update the label containing the number of images
         self.set_images_label()
         # Delete the container
@@ -229,30 +274,27 @@ class ImageFrame:
         # Create a container for the image
         self.frame = tk.Frame(self.parent)
 
-        # Resize the image with the size limit (keeping ratio)
-        image_width = self.image.width
-        image_height = self.image.height
-        if image_width > image_height:
-            resize_width = MAX_PREVIEW_IMAGE_SIZE
-            resize_height = int(image_height / (image_width / MAX_PREVIEW_IMAGE_SIZE))
-        else:
-            resize_height = MAX_PREVIEW_IMAGE_SIZE
-            resize_width = int(image_width / (image_height / MAX_PREVIEW_IMAGE_SIZE))
-        image_resized = self.image.resize(
-            (resize_width, resize_height), Image.ANTIALIAS
-        )
-
-        # Convert the image for Tkinter
-        self.display_image = ImageTk.PhotoImage(image_resized)
-
-        # Add the image with the delete click event
-        button_image = tk.Button(
-            self.frame, image=self.display_image, command=self.delete
-        )
-        button_image.pack()
+        # Add the image with the delete click event, the preview of a large
+        # image is displayed when it is computed
+        self.display_image = None
+        self.button_image = tk.Button(self.frame, text="...", command=self.delete)
+        self.button_image.pack()
+        self.display_preview()
 
         self.show()
 
+    def display_preview(self):
+        """Display the preview of the staged image if it is computed"""
+        if self.image is None or self.image.preview is None:
+            return
+        # Already imported by the paste of the image
+        from PIL import ImageTk  # pylint: disable=import-outside-toplevel
+
+        # Convert the preview of the staged image for Tkinter
+        with span("ImageTk.PhotoImage", "image"):
+            self.display_image = ImageTk.PhotoImage(self.image.preview)
+        self.button_image.config(image=self.display_image)
+
     def delete(self):
         """Delete the image"""
         self.delete_image_function(self.image, self)
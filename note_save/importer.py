@@ -0,0 +1,161 @@
+"""Import of the images and text notes of a folder tree into a collection
+
+Each image file and each text file becomes an entry, saved like the pasted
+inputs, oldest file first. The files are opened and verified by a pool of
+threads while the previous ones are saved. The imported files are written
+to a checkpoint in the collection folder, an interrupted import skips them
+when it is started again.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
+from os import path, scandir
+
+from .clipboard_image import load_image
+from .configuration import (
+    IMPORT_CHECKPOINT_PREFIX,
+    IMPORT_EVICT_INTERVAL,
+    IMPORT_IMAGE_EXTENSIONS,
+    IMPORT_TEXT_EXTENSIONS,
+    IMPORT_WORKERS,
+    SAVE_FOLDER,
+)
+from .files import create_full_path
+from .save import save
+from .thumbnails import evict_thumbnails
+
+# Files read in advance by the workers, waiting to be saved
+READ_AHEAD_BY_WORKER = 4
+
+
+def list_import_files(folder):
+    """Return the (relative path, size, modification time) of the files to import"""
+    files = []
+    folders = [folder]
+    while len(folders) > 0:
+        with scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.is_file() and path.splitext(entry.name)[1].lower() in (
+                    IMPORT_IMAGE_EXTENSIONS + IMPORT_TEXT_EXTENSIONS
+                ):
+                    entry_stat = entry.stat()
+                    files.append(
+                        (
+                            path.relpath(entry.path, folder),
+                            entry_stat.st_size,
+                            entry_stat.st_mtime_ns,
+                        )
+                    )
+    # In the order the files were created, like the pasted inputs
+    files.sort(key=lambda file: (file[2], file[0]))
+    return files
+
+
+def get_checkpoint_path(folder, collection):
+    """Return the path of the checkpoint of the import of a folder into a collection"""
+    folder_hash = sha256(path.abspath(folder).encode("utf8")).hexdigest()[:16]
+    return f"{SAVE_FOLDER}/{collection}/{IMPORT_CHECKPOINT_PREFIX}{folder_hash}.log"
+
+
+def read_checkpoint(checkpoint_path):
+    """Return the (relative path, size, modification time) of the imported files"""
+    imported_files = set()
+    try:
+        with open(checkpoint_path, "r", encoding="utf8") as opened_file:
+            for line in opened_file:
+                try:
+                    imported_files.add(tuple(loads(line)))
+                except (JSONDecodeError, TypeError):
+                    # Line not fully written when the import was interrupted
+                    continue
+    except FileNotFoundError:
+        pass
+    return imported_files
+
+
+def read_import_file(folder, file):
+    """Return the text, the images and a message of a file (in a worker thread)"""
+    file_path = path.join(folder, file[0])
+    if path.splitext(file_path)[1].lower() in IMPORT_TEXT_EXTENSIONS:
+        try:
+            with open(file_path, "r", encoding="utf8", errors="replace") as opened_file:
+                return opened_file.read().strip(), [], None
+        except OSError as error:
+            return "", [], f"Cannot read {file[0]}.\n{error}"
+
+    image, message = load_image(file_path)
+    if image is None:
+        return "", [], message or f"Cannot open {file[0]}."
+    try:
+        # Decode the pixels to verify the image
+        image.load()
+    except OSError as error:
+        return "", [], f"Cannot open {file[0]}.\n{error}"
+    return "", [image], message
+
+
+def import_folder(folder, collection, workers=IMPORT_WORKERS, progress=None):
+    """Import the files of a folder tree into a collection
+
+    The progress function is called after each file with the number of files
+    done, the total number of files and the message of the file or None.
+    Return the numbers of imported, skipped and failed files.
+    """
+    checkpoint_path = get_checkpoint_path(folder, collection)
+    imported_files = read_checkpoint(checkpoint_path)
+    files = list_import_files(folder)
+    new_files = [file for file in files if file not in imported_files]
+    skipped = len(files) - len(new_files)
+    imported = 0
+    failed = 0
+
+    create_full_path(f"{SAVE_FOLDER}/{collection}")
+    with ThreadPoolExecutor(workers) as executor, open(
+        checkpoint_path, "a", encoding="utf8"
+    ) as checkpoint:
+        pending = deque()
+        next_file = 0
+        while next_file < len(new_files) or len(pending) > 0:
+            # Keep the workers busy while the files are saved in order
+            while (
+                next_file < len(new_files)
+                and len(pending) < workers * READ_AHEAD_BY_WORKER
+            ):
+                file = new_files[next_file]
+                pending.append((file, executor.submit(read_import_file, folder, file)))
+                next_file += 1
+
+            file, future = pending.popleft()
+            text, images, message = future.result()
+            if len(text) > 0 or len(images) > 0:
+                # The thumbnail cache is trimmed every few files, not by each save
+                if not save(collection, text, images, evict=False):
+                    # Stop on the first error, the import can be resumed
+                    for _, other_future in pending:
+                        other_future.cancel()
+                    failed += 1
+                    break
+                # Written after the entry, an interrupted file is imported again
+                checkpoint.write(dumps(list(file)) + "\n")
+                checkpoint.flush()
+                imported += 1
+                if imported % IMPORT_EVICT_INTERVAL == 0:
+                    evict_thumbnails(collection)
+            elif message is not None:
+                failed += 1
+            else:
+                # Empty text file
+                skipped += 1
+
+            if progress is not None:
+                progress(skipped + imported + failed, len(files), message)
+
+    if imported % IMPORT_EVICT_INTERVAL != 0:
+        evict_thumbnails(collection)
+    return imported, skipped, failed
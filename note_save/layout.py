@@ -0,0 +1,195 @@
+"""Placement of the entries in lines and pages, without any GUI"""
+
+from array import array
+from bisect import bisect_right
+from math import ceil
+
+from .configuration import EXPLORER_MAX_LINES_BY_PAGE, PREVIEW_IMAGES_BY_LINE
+
+
+class PageLayout:
+    """Entries packed in lines of medias and pages of lines
+
+    An entry takes one media for each image, 1 by default for the text.
+    A line contains entries until PREVIEW_IMAGES_BY_LINE medias, an entry with
+    more medias takes multiple lines. A page contains lines until
+    EXPLORER_MAX_LINES_BY_PAGE lines.
+    """
+
+    def __init__(
+        self,
+        images_by_line=PREVIEW_IMAGES_BY_LINE,
+        lines_by_page=EXPLORER_MAX_LINES_BY_PAGE,
+    ):
+        self.images_by_line = images_by_line
+        self.lines_by_page = lines_by_page
+
+        # By entry
+        self.media_lengths = array("I")
+        self.entry_lines = array("I")
+        self.entry_columns = array("I")
+
+        # By line
+        self.line_media_lengths = array("I")
+        self.line_pages = array("I")
+
+        # By page, the first entry of each page is a prefix sum of the entries by page
+        self.page_starts = array("I")
+        self.page_first_lines = array("I")
+        # Lines before each page, a prefix sum of the page heights
+        self.page_offsets = array("I")
+        # Lines used in the last page and in all the pages
+        self.last_page_height = 0
+        self.height = 0
+
+    def __len__(self):
+        return len(self.media_lengths)
+
+    def append(self, image_count):
+        """Add an entry with a number of images after the others"""
+        media_length = max(1, image_count)
+        self.media_lengths.append(media_length)
+
+        if (
+            len(self.line_media_lengths) > 0
+            and self.line_media_lengths[-1] + media_length <= self.images_by_line
+        ):
+            # The entry can be added to the last line, its height does not change
+            self.entry_columns.append(self.entry_columns[-1] + 1)
+            self.line_media_lengths[-1] += media_length
+        else:
+            # New line, taking multiple lines if there are too many medias
+            line_height = ceil(media_length / self.images_by_line)
+            self.entry_columns.append(0)
+            self.line_media_lengths.append(media_length)
+
+            if (
+                len(self.page_starts) > 0
+                and self.last_page_height + line_height <= self.lines_by_page
+            ):
+                # The line can be added to the last page
+                self.last_page_height += line_height
+            else:
+                # New page
+                self.page_starts.append(len(self.media_lengths) - 1)
+                self.page_first_lines.append(len(self.line_media_lengths) - 1)
+                self.page_offsets.append(self.height)
+                self.last_page_height = line_height
+            self.height += line_height
+            self.line_pages.append(len(self.page_starts) - 1)
+
+        self.entry_lines.append(len(self.line_media_lengths) - 1)
+
+    def extend(self, image_counts):
+        """Add entries with their number of images after the others"""
+        for image_count in image_counts:
+            self.append(image_count)
+
+    def page_count(self):
+        """Return the number of pages"""
+        return len(self.page_starts)
+
+    def page_range(self, page):
+        """Return the indexes of the first and after the last entries of a page"""
+        if page + 1 < len(self.page_starts):
+            return self.page_starts[page], self.page_starts[page + 1]
+        return self.page_starts[page], len(self.media_lengths)
+
+    def page_height(self, page):
+        """Return the number of lines of a page"""
+        if page + 1 < len(self.page_offsets):
+            return self.page_offsets[page + 1] - self.page_offsets[page]
+        return self.height - self.page_offsets[page]
+
+    def page_at_line(self, line):
+        """Return the page containing a line counted from the first page"""
+        return max(0, bisect_right(self.page_offsets, line) - 1)
+
+    def page_of(self, index):
+        """Return the page containing an entry"""
+        return self.line_pages[self.entry_lines[index]]
+
+    def position(self, index):
+        """Return the line in its page, the column and the number of medias of an entry"""
+        line = self.entry_lines[index]
+        return (
+            line - self.page_first_lines[self.line_pages[line]],
+            self.entry_columns[index],
+            self.media_lengths[index],
+        )
+
+
+class ReversedLayout:
+    """A PageLayout displayed from its last entry to its first
+
+    The entries are placed in the order they are added, so adding entries
+    only places the new ones. The last page is displayed first, the lines
+    and the entries of a line in reverse order. The indexes are counted from
+    the last entry.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def __len__(self):
+        return len(self.layout)
+
+    @property
+    def height(self):
+        """Lines used in all the pages"""
+        return self.layout.height
+
+    def append(self, image_count):
+        """Add an entry with a number of images, displayed before the others"""
+        self.layout.append(image_count)
+
+    def extend(self, image_counts):
+        """Add entries with their number of images, displayed before the others"""
+        self.layout.extend(image_counts)
+
+    def page_count(self):
+        """Return the number of pages"""
+        return self.layout.page_count()
+
+    def page_range(self, page):
+        """Return the indexes of the first and after the last entries of a page"""
+        start, end = self.layout.page_range(self.page_count() - 1 - page)
+        return len(self) - end, len(self) - start
+
+    def page_height(self, page):
+        """Return the number of lines of a page"""
+        return self.layout.page_height(self.page_count() - 1 - page)
+
+    def page_at_line(self, line):
+        """Return the page containing a line counted from the first page"""
+        line = min(max(line, 0), max(self.height - 1, 0))
+        return max(
+            0, self.page_count() - 1 - self.layout.page_at_line(self.height - 1 - line)
+        )
+
+    def page_of(self, index):
+        """Return the page containing an entry"""
+        return self.page_count() - 1 - self.layout.page_of(len(self) - 1 - index)
+
+    def position(self, index):
+        """Return the line in its page, the column and the number of medias of an entry"""
+        layout_index = len(self) - 1 - index
+        line, _, media_length = self.layout.position(layout_index)
+
+        # The entries after it in its line are displayed before it
+        line_index = self.layout.entry_lines[layout_index]
+        next_index = layout_index + 1
+        while (
+            next_index < len(self.layout)
+            and self.layout.entry_lines[next_index] == line_index
+        ):
+            next_index += 1
+
+        # An entry taller than a line is counted as one line, like in position
+        page = self.layout.line_pages[line_index]
+        if page + 1 < len(self.layout.page_first_lines):
+            page_lines = self.layout.page_first_lines[page + 1]
+        else:
+            page_lines = len(self.layout.line_media_lengths)
+        page_lines -= self.layout.page_first_lines[page]
+        return (page_lines - 1 - line, next_index - 1 - layout_index, media_length)
@@ -1,12 +1,24 @@
 """Loading texts and image names from a collection"""
 
+from array import array
+
+from .blobs import get_blob_path, is_blob
 from .configuration import (
     SAVE_FOLDER,
-    TEXT_FILE_NAME,
     TEXT_IMAGE_SEPARATOR,
     TEXT_MARKER,
     TEXT_SEPARATOR,
 )
+from .entry_log import (
+    LOG_MAGIC,
+    decode_record,
+    get_file_version,
+    is_log,
+    iter_records,
+)
+from .files import get_image_file_name, map_file
+from .text_index import ENCODED_MARKER, get_text_path
+from .tracing import traced
 
 
 def read_text(file):
@@ -18,9 +30,55 @@ def read_text(file):
         return ""
 
 
+def get_image_path(collection, image_name):
+    """Return the path of an image of a collection, stored in it or as a blob"""
+    if is_blob(image_name):
+        return get_blob_path(image_name)
+    return f"{SAVE_FOLDER}/{collection}/{get_image_file_name(image_name)}"
+
+
+def parse_entry(entry):
+    """Return the file names and the text of an entry without its marker"""
+    splitted_entry = entry.split(sep=TEXT_SEPARATOR)
+    image_names = splitted_entry[0].split(sep=TEXT_IMAGE_SEPARATOR)
+    if len(splitted_entry) > 1:
+        text = splitted_entry[1:]
+        if len(text) > 0 and text[-1] == "":
+            del text[-1]
+        # Joining the rest if the separator is in the text
+        text = TEXT_SEPARATOR.join(text)
+    else:
+        text = ""
+
+    return (image_names, text)
+
+
+def format_json_entry(entry_number, entry):
+    """Return the JSON object of an entry"""
+    image_names, text = entry
+    return {
+        "number": entry_number,
+        "images": [image_name for image_name in image_names if len(image_name) > 0],
+        "text": text,
+    }
+
+
+def decode_entry(record):
+    """Return the (file names, text) of an entry log record, empty if it is corrupted"""
+    try:
+        return decode_record(record)
+    except ValueError as error:
+        print(f"Cannot read the entry.\n{error}")
+        return ([""], "")
+
+
+@traced("load.load", "storage")
 def load(collection):
     """Load a collection as a list of file names and texts"""
-    text_content = read_text(f"{SAVE_FOLDER}/{collection}/{TEXT_FILE_NAME}")
+    if get_file_version(get_text_path(collection)) == 2:
+        return list(iter_entries(collection))
+
+    text_content = read_text(get_text_path(collection))
 
     entries = text_content.split(sep=TEXT_MARKER)
     del entries[0]
@@ -29,17 +87,155 @@ def load(collection):
     elements = []
 
     for entry in entries:
-        splitted_entry = entry.split(sep=TEXT_SEPARATOR)
-        image_names = splitted_entry[0].split(sep=TEXT_IMAGE_SEPARATOR)
-        if len(splitted_entry) > 1:
-            text = splitted_entry[1:]
-            if len(text) > 0 and text[-1] == "":
-                del text[-1]
-            # Joining the rest if the separator is in the text
-            text = TEXT_SEPARATOR.join(text)
-        else:
-            text = ""
-
-        elements.append((image_names, text))
+        elements.append(parse_entry(entry))
+
+    return elements
+
 
+@traced("load.load_entries", "storage")
+def load_entries(collection, records):
+    """Load only the entries of the index records (offset, length, image count)"""
+    elements = []
+    try:
+        with open(get_text_path(collection), "rb") as opened_file:
+            log = is_log(opened_file.read(len(LOG_MAGIC)))
+            for offset, length, _ in records:
+                opened_file.seek(offset)
+                if log:
+                    elements.append(decode_entry(opened_file.read(length)))
+                    continue
+                entry = opened_file.read(length).decode("utf8")
+                # Same newlines as a file opened in text mode
+                entry = entry.replace("\r\n", "\n").replace("\r", "\n")
+                elements.append(parse_entry(entry[len(TEXT_MARKER) :]))
+    except FileNotFoundError:
+        pass
     return elements
+
+
+class Entry:
+    """An entry of a mapped text file, decoded only when accessed
+
+    It can be used like the (file names, text) tuples returned by load().
+    """
+
+    __slots__ = ("data", "start", "end", "names_end")
+
+    def __init__(self, data, start, end):
+        # Mapped text file and position of the entry without its marker
+        self.data = data
+        self.start = start
+        self.end = end
+
+        # End of the image names line, the first new line character
+        self.names_end = -1
+        for new_line in (b"\n", b"\r"):
+            position = data.find(new_line, start, end)
+            if position != -1 and (self.names_end == -1 or position < self.names_end):
+                self.names_end = position
+
+    @property
+    def image_names(self):
+        """Return the image names of the entry"""
+        names_end = self.end if self.names_end == -1 else self.names_end
+        return (
+            self.data[self.start : names_end]
+            .decode("utf8")
+            .split(sep=TEXT_IMAGE_SEPARATOR)
+        )
+
+    @property
+    def text(self):
+        """Return the text of the entry"""
+        if self.names_end == -1:
+            return ""
+        text = self.data[self.names_end : self.end].decode("utf8")
+        # Same newlines as a file opened in text mode
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        # Without the separator after the image names and the last new line
+        text = text[len(TEXT_SEPARATOR) :]
+        if text.endswith(TEXT_SEPARATOR):
+            text = text[: -len(TEXT_SEPARATOR)]
+        return text
+
+    def __getitem__(self, index):
+        return (self.image_names, self.text)[index]
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        return iter((self.image_names, self.text))
+
+
+def iter_entries(collection):
+    """Yield the entries of a collection one by one from the mapped text file"""
+    data = map_file(get_text_path(collection))
+    if data is None:
+        return
+    if is_log(data):
+        for offset, length, _ in iter_records(data):
+            yield decode_entry(data[offset : offset + length])
+        return
+    offset = data.find(ENCODED_MARKER)
+    while offset != -1:
+        next_offset = data.find(ENCODED_MARKER, offset + len(ENCODED_MARKER))
+        yield Entry(
+            data,
+            offset + len(ENCODED_MARKER),
+            len(data) if next_offset == -1 else next_offset,
+        )
+        offset = next_offset
+
+
+class EntrySequence:
+    """Random access to the entries of a collection from the mapped text file
+
+    Only the offsets of the entries are kept in memory.
+    """
+
+    def __init__(self, collection):
+        self.data = map_file(get_text_path(collection))
+        self.log = self.data is not None and is_log(self.data)
+
+        # Position of each marker or record
+        self.offsets = array("Q")
+        self.end = 0
+        if self.log:
+            # End of the last record, a partially written record is ignored
+            self.end = len(LOG_MAGIC)
+            for offset, length, _ in iter_records(self.data):
+                self.offsets.append(offset)
+                self.end = offset + length
+        elif self.data is not None:
+            self.end = len(self.data)
+            offset = self.data.find(ENCODED_MARKER)
+            while offset != -1:
+                self.offsets.append(offset)
+                offset = self.data.find(ENCODED_MARKER, offset + len(ENCODED_MARKER))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("entry index out of range")
+        end = self.end if index + 1 == len(self) else self.offsets[index + 1]
+        if self.log:
+            return decode_entry(self.data[self.offsets[index] : end])
+        return Entry(self.data, self.offsets[index] + len(ENCODED_MARKER), end)
+
+    def close(self):
+        """Unmap the text file, the entries cannot be accessed anymore"""
+        if self.data is not None:
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
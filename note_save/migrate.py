@@ -0,0 +1,39 @@
+"""Copy the entries of the collections from a storage to another
+
+python -m note_save.migrate [--from files] [--to sqlite] [collection ...]
+"""
+
+from argparse import ArgumentParser
+
+from .storage import create_storage, migrate
+
+BACKENDS = ("files", "sqlite")
+
+
+def main(arguments=None):
+    """Migrate the collections given in the command line arguments"""
+    parser = ArgumentParser(
+        prog="python -m note_save.migrate",
+        description="Copy the entries of the collections to another storage.",
+    )
+    parser.add_argument("--from", dest="source", choices=BACKENDS, default="files")
+    parser.add_argument("--to", dest="target", choices=BACKENDS, default="sqlite")
+    parser.add_argument(
+        "collections", nargs="*", help="collections to migrate, all by default"
+    )
+    arguments = parser.parse_args(arguments)
+    if arguments.source == arguments.target:
+        parser.error("the source and the target storages are the same")
+
+    source = create_storage(arguments.source)
+    target = create_storage(arguments.target)
+    try:
+        copied = migrate(source, target, arguments.collections or None)
+    finally:
+        source.close()
+        target.close()
+    print(f"{copied} entr{'ies' if copied != 1 else 'y'} migrated.")
+
+
+if __name__ == "__main__":
+    main()
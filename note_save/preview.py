@@ -0,0 +1,38 @@
+"""Small previews of the images, computed with the cheapest downscaling"""
+
+from PIL import Image
+
+from .configuration import MAX_PREVIEW_IMAGE_SIZE, PREVIEW_REDUCING_GAP
+
+try:
+    RESAMPLING = Image.Resampling.LANCZOS
+except AttributeError:
+    # Pillow < 9.1
+    RESAMPLING = Image.LANCZOS  # pylint: disable=no-member
+
+
+def get_preview_size(width, height, max_size=MAX_PREVIEW_IMAGE_SIZE):
+    """Return the size of a preview with the size limit (keeping ratio)"""
+    if width > height:
+        return max_size, max(1, int(height / (width / max_size)))
+    return max(1, int(width / (height / max_size))), max_size
+
+
+def make_preview(image, opened_for_preview=False, max_size=MAX_PREVIEW_IMAGE_SIZE):
+    """Return a preview of an image
+
+    An image opened only for its preview can be decoded at a reduced scale,
+    the other images are not modified.
+    """
+    preview_size = get_preview_size(image.width, image.height, max_size)
+
+    if opened_for_preview and image.format == "JPEG":
+        # The JPEG decoder can skip most of the pixels, before loading the image
+        image.draft("RGB", preview_size)
+
+    try:
+        # Reduce by an integer factor first, then resample the small image
+        return image.resize(preview_size, RESAMPLING, reducing_gap=PREVIEW_REDUCING_GAP)
+    except TypeError:
+        # Pillow < 7 without reducing_gap
+        return image.resize(preview_size, RESAMPLING)
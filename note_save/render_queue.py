@@ -0,0 +1,57 @@
+"""Queue of GUI updates posted by the workers and executed by the Tk thread"""
+
+from queue import Empty, SimpleQueue
+from time import perf_counter
+from tkinter import TclError
+
+from .configuration import RENDER_QUEUE_INTERVAL, RENDER_QUEUE_TIME_BUDGET
+from .tracing import traced
+
+
+class RenderQueue:
+    """GUI updates executed in batches by the Tk thread"""
+
+    def __init__(self, root):
+        self.root = root
+        self.queue = SimpleQueue()
+
+        self.after_id = self.root.after(RENDER_QUEUE_INTERVAL, self.drain)
+
+    def post(self, function, *args):
+        """Add a GUI update to the queue, can be called from any thread"""
+        self.queue.put((function, args))
+
+    @traced("RenderQueue.drain", "tk")
+    def drain(self):
+        """Execute the GUI updates until the queue is empty or the time budget is spent"""
+        deadline = perf_counter() + RENDER_QUEUE_TIME_BUDGET / 1000
+        while perf_counter() < deadline:
+            if not self.execute_next():
+                break
+
+        # All the widgets created in this batch are placed in the same layout pass
+        self.after_id = self.root.after(RENDER_QUEUE_INTERVAL, self.drain)
+
+    def execute_next(self):
+        """Execute the next GUI update, return False if the queue is empty"""
+        try:
+            function, args = self.queue.get_nowait()
+        except Empty:
+            return False
+        try:
+            function(*args)
+        except TclError as error:
+            # The widget was destroyed before being updated
+            print(f"Cannot update the GUI.\n{error}")
+        return True
+
+    def flush(self):
+        """Execute all the GUI updates of the queue at once"""
+        while self.execute_next():
+            pass
+
+    def stop(self):
+        """Stop executing the GUI updates"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
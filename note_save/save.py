@@ -1,17 +1,25 @@
 """Images and text saving"""
 
 from datetime import datetime
+from os import path
 
+from .blobs import add_blob_references, get_blob_name, get_digest_blob_name
+from .catalog import get_text_size, invalidate_collections, update_manifest
 from .configuration import (
+    DEDUPLICATE_IMAGES,
     IMAGE_EXTENSION,
-    IMAGE_EXTENSION_TYPE,
+    IMAGE_PROFILE,
+    IMAGE_PROFILES,
     SAVE_FOLDER,
-    TEXT_FILE_NAME,
-    TEXT_IMAGE_SEPARATOR,
-    TEXT_MARKER,
-    TEXT_SEPARATOR,
 )
+from .encoding import encode_images
 from .files import create_full_path, is_file, is_folder
+from .load import get_image_path
+from .search import add_to_search_index
+from .staging import StagedImage
+from .storage import StorageError, get_storage
+from .thumbnails import ensure_thumbnail, evict_thumbnails
+from .tracing import traced
 
 
 def get_time():
@@ -31,47 +39,135 @@ def name_image(folder, index=0):
     return f"{image_name}" + f"_{index}" * (index != 0)
 
 
-def save(collection, text, images):
-    """Save the text and images to the collection folder"""
+def name_images(folder, count, extension=IMAGE_EXTENSION):
+    """Return names for several images, reserved at once in the same order
+
+    The extension is only part of the names when it is not IMAGE_EXTENSION.
+    """
+    image_name = get_time()
+    image_names = []
+    index = 0
+    while len(image_names) < count:
+        # Skip the names already used in the folder
+        indexed_image_name = f"{image_name}" + f"_{index}" * (index != 0)
+        if not is_file(f"{folder}/{indexed_image_name}{extension}"):
+            image_names.append(
+                indexed_image_name + extension * (extension != IMAGE_EXTENSION)
+            )
+        index += 1
+    return image_names
+
+
+def get_image_blob_name(image, extension=""):
+    """Return the image name of the blob of an image or of a staged image"""
+    if isinstance(image, StagedImage):
+        return get_digest_blob_name(image.get_digest(), extension)
+    return get_blob_name(image, extension)
+
+
+def write_images(encodings, profile=IMAGE_PROFILE):
+    """Save the images of a list of (image, path), the staged images are only moved"""
+    encode_images(
+        [
+            (image, image_path)
+            for image, image_path in encodings
+            if not isinstance(image, StagedImage)
+        ],
+        profile,
+    )
+    for image, image_path in encodings:
+        if isinstance(image, StagedImage):
+            image.save_to(image_path)
+
+
+@traced("save.save", "save")
+def save(collection, text, images, evict=True):
+    """Save the text and images to the collection folder
+
+    Without evict, the thumbnail cache is not trimmed, the caller evicts it later.
+    """
 
     # Checking if the collection folder exists
     if not is_folder(f"{SAVE_FOLDER}/{collection}"):
         # If not, create it
         create_full_path(f"{SAVE_FOLDER}/{collection}")
+        invalidate_collections()
 
-    # Saving images with a custom name
-    image_names = []
-    for image in images:
-        # Create a name
-        image_name = name_image(f"{SAVE_FOLDER}/{collection}")
-        image_names.append(image_name)
-        # Save
-        try:
-            image.save(
-                f"{SAVE_FOLDER}/{collection}/{image_name}{IMAGE_EXTENSION}",
-                IMAGE_EXTENSION_TYPE,
-            )
-        except IOError as error:
-            print(f"Cannot save image.\n{error}")
-            return False
+    # Reserving the names of the images before encoding them
+    extension = IMAGE_PROFILES[IMAGE_PROFILE][0]
+    encodings = []
+    if DEDUPLICATE_IMAGES:
+        # Identical images are stored once for all the collections
+        image_names = [
+            get_image_blob_name(image, extension * (extension != IMAGE_EXTENSION))
+            for image in images
+        ]
+        for image, image_name in zip(images, image_names):
+            image_path = get_image_path(collection, image_name)
+            if not is_file(image_path) and image_path not in [
+                path for _, path in encodings
+            ]:
+                create_full_path(path.dirname(image_path))
+                encodings.append((image, image_path))
+    else:
+        image_names = name_images(f"{SAVE_FOLDER}/{collection}", len(images), extension)
+        encodings = [
+            (image, get_image_path(collection, image_name))
+            for image, image_name in zip(images, image_names)
+        ]
+
+    # Saving images, in parallel when there are several images
+    try:
+        write_images(encodings, IMAGE_PROFILE)
+    except IOError as error:
+        print(f"Cannot save image.\n{error}")
+        return False
 
     # Saving text with a reference to the images
-    text_to_save = (
-        f"{TEXT_MARKER}{TEXT_IMAGE_SEPARATOR.join(image_names)}"
-        f"{TEXT_SEPARATOR}{text}"
-    )
-    if text_to_save[-1] != "\n":
-        text_to_save += "\n"
+    text_size = get_text_size(collection)
     try:
-        add_text(f"{SAVE_FOLDER}/{collection}/{TEXT_FILE_NAME}", text_to_save)
-    except FileNotFoundError as error:
+        entry_number = get_storage().append(collection, image_names, text, get_time())
+    except (OSError, StorageError) as error:
         print(f"Cannot save text.\n{error}")
         return False
 
-    return True
+    # Only the references of the saved entries are counted
+    if DEDUPLICATE_IMAGES and len(image_names) > 0:
+        try:
+            add_blob_references(image_names)
+        except OSError as error:
+            print(f"Cannot update the blob references.\n{error}")
 
+    # Keep the search index up to date
+    if entry_number is not None:
+        try:
+            add_to_search_index(collection, entry_number, text)
+        except OSError as error:
+            print(f"Cannot update the search index.\n{error}")
+
+    # The thumbnails are only a cache, a failure never cancels the saved entry
+    try:
+        for image, image_name in zip(images, image_names):
+            ensure_thumbnail(
+                collection,
+                get_image_path(collection, image_name),
+                image.get_preview() if isinstance(image, StagedImage) else image,
+            )
+        if evict and len(images) > 0:
+            evict_thumbnails(collection)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        print(f"Cannot create the thumbnails.\n{error}")
 
-def add_text(file, text):
-    """Append text to a file"""
-    with open(file, "a", encoding="utf8") as opened_file:
-        opened_file.write(text)
+    # Keep the manifest up to date, the blobs are not in the collection folder
+    update_manifest(
+        collection,
+        len(images),
+        [
+            image_path
+            for _, image_path in encodings
+            if image_path.startswith(f"{SAVE_FOLDER}/{collection}/")
+        ],
+        text_size,
+    )
+
+    return True
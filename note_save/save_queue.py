@@ -0,0 +1,78 @@
+"""Saving in the background, in the order of the inputs"""
+
+from queue import Queue
+from threading import Lock, Thread
+
+
+class SaveQueue:
+    """Saves executed one by one by a background writer
+
+    The queue is bounded, adding a save waits when it is full.
+    """
+
+    def __init__(self, max_size, render_queue, saved_function):
+        self.queue = Queue(max_size)
+
+        # Function called by the Tk thread after each save with the collection,
+        # the text, the images, the result of the save and the number of
+        # pending saves
+        self.render_queue = render_queue
+        self.saved_function = saved_function
+
+        self.pending = 0
+        self.lock = Lock()
+
+        self.writer = Thread(target=self.work, daemon=True)
+        self.writer.start()
+
+    def submit(self, collection, text, images):
+        """Add a save to the queue"""
+        with self.lock:
+            self.pending += 1
+        self.queue.put((collection, text, images))
+
+    def pending_count(self):
+        """Return the number of saves not finished yet"""
+        with self.lock:
+            return self.pending
+
+    def work(self):
+        """Execute the saves until the queue is stopped"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+
+            # Imported with the first save, PIL is not needed to open the window
+            from .save import save  # pylint: disable=import-outside-toplevel
+            from .staging import (  # pylint: disable=import-outside-toplevel
+                discard_images,
+            )
+
+            collection, text, images = item
+            try:
+                saved = save(collection, text, images)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                print(f"Cannot save.\n{error}")
+                saved = False
+            if saved:
+                # The staged images were moved, a failed save keeps them to be retried
+                discard_images(images)
+
+            with self.lock:
+                self.pending -= 1
+                pending = self.pending
+            self.render_queue.post(
+                self.saved_function, collection, text, images, saved, pending
+            )
+            self.queue.task_done()
+
+    def flush(self):
+        """Wait for all the pending saves"""
+        self.queue.join()
+
+    def stop(self):
+        """Finish the pending saves and stop the writer"""
+        self.queue.put(None)
+        self.writer.join()
@@ -0,0 +1,97 @@
+"""Background tasks executed by a bounded pool of workers"""
+
+from enum import IntEnum
+from itertools import count
+from queue import PriorityQueue
+from threading import Lock, Thread
+
+
+class Priority(IntEnum):
+    """Priorities of the tasks, the lowest value runs first"""
+
+    VISIBLE = 0
+    PREFETCH = 1
+    INDEXING = 2
+
+
+class Task:
+    """A function waiting to be executed by a worker"""
+
+    def __init__(self, function, args, group):
+        self.function = function
+        self.args = args
+        self.group = group
+        self.cancelled = False
+
+    def cancel(self):
+        """Prevent the task from running if it has not started yet"""
+        self.cancelled = True
+
+    def run(self):
+        """Execute the function if the task is not cancelled"""
+        if not self.cancelled:
+            self.function(*self.args)
+
+
+class TaskScheduler:
+    """Shared pool of workers executing the tasks by priority"""
+
+    def __init__(self, worker_count):
+        self.queue = PriorityQueue()
+        # Keep the submission order between tasks of the same priority
+        self.order = count()
+
+        # Pending tasks by group, to cancel them together
+        self.groups = {}
+        self.lock = Lock()
+
+        self.workers = [
+            Thread(target=self.work, daemon=True) for _ in range(worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, function, *args, priority=Priority.VISIBLE, group=None):
+        """Add a task to the queue and return it"""
+        task = Task(function, args, group)
+        with self.lock:
+            self.groups.setdefault(group, set()).add(task)
+        self.queue.put((priority, next(self.order), task))
+        return task
+
+    def cancel_group(self, group):
+        """Cancel all the pending tasks of a group"""
+        with self.lock:
+            tasks = self.groups.pop(group, set())
+        for task in tasks:
+            task.cancel()
+
+    def work(self):
+        """Execute the tasks until the scheduler is shut down"""
+        while True:
+            _, _, task = self.queue.get()
+            if task is None:
+                return
+
+            with self.lock:
+                group_tasks = self.groups.get(task.group)
+                if group_tasks is not None:
+                    group_tasks.discard(task)
+                    if len(group_tasks) == 0:
+                        del self.groups[task.group]
+
+            try:
+                task.run()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # A failing task must not stop the worker
+                print(f"Background task failed.\n{error}")
+
+    def shutdown(self):
+        """Cancel the pending tasks and stop the workers"""
+        with self.lock:
+            groups = list(self.groups)
+        for group in groups:
+            self.cancel_group(group)
+        # Stop signals are executed before any remaining task
+        for _ in self.workers:
+            self.queue.put((-1, next(self.order), None))
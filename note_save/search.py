@@ -0,0 +1,185 @@
+"""Full-text search in the entries of a collection"""
+
+from array import array
+from bisect import bisect_left
+from re import findall
+from threading import Lock
+
+from .configuration import SAVE_FOLDER, SEARCH_INDEX_FILE_NAME
+from .storage import get_storage
+from .tracing import traced
+
+SEARCH_INDEX_HEADER = "NSS1\n"
+# Entries loaded at once while rebuilding a search index
+REBUILD_PAGE_SIZE = 1000
+
+# Search indexes already loaded by collection
+search_indexes = {}
+# Only one thread at a time can load or modify the search indexes
+search_lock = Lock()
+
+
+def tokenize(text):
+    """Return the distinct lowercase words of a text"""
+    return set(findall(r"\w+", text.lower()))
+
+
+def get_search_index_path(collection):
+    """Return the path of the search index of a collection"""
+    return f"{SAVE_FOLDER}/{collection}/{SEARCH_INDEX_FILE_NAME}"
+
+
+class SearchIndex:
+    """Entry numbers containing each word of a collection
+
+    The file is a log with a line by entry: its number and its words.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.entry_numbers = set()
+        # Largest indexed entry number, -1 when empty
+        self.max_entry_number = -1
+        # Sorted words for the prefix search, built when needed
+        self.sorted_words = None
+
+    def add(self, entry_number, words):
+        """Add the words of an entry"""
+        self.entry_numbers.add(entry_number)
+        self.max_entry_number = max(self.max_entry_number, entry_number)
+        for word in words:
+            self.postings.setdefault(word, array("I")).append(entry_number)
+        if len(words) > 0:
+            self.sorted_words = None
+
+    def match_prefix(self, prefix):
+        """Return the entry numbers containing a word starting with the prefix"""
+        if self.sorted_words is None:
+            self.sorted_words = sorted(self.postings)
+        entry_numbers = set()
+        position = bisect_left(self.sorted_words, prefix)
+        while position < len(self.sorted_words) and self.sorted_words[
+            position
+        ].startswith(prefix):
+            entry_numbers.update(self.postings[self.sorted_words[position]])
+            position += 1
+        return entry_numbers
+
+    def search(self, query):
+        """Return the sorted entry numbers containing all the words of the query as prefixes"""
+        entry_numbers = None
+        # Most selective words first
+        for prefix in sorted(tokenize(query), key=len, reverse=True):
+            matches = self.match_prefix(prefix)
+            entry_numbers = (
+                matches if entry_numbers is None else entry_numbers & matches
+            )
+            if len(entry_numbers) == 0:
+                break
+        return sorted(entry_numbers or [])
+
+
+def format_line(entry_number, words):
+    """Return the line of an entry in the search index file"""
+    return f"{entry_number}\t{' '.join(sorted(words))}\n"
+
+
+def read_search_index(collection):
+    """Return the search index stored in the file of a collection, None if it is invalid"""
+    search_index = SearchIndex()
+    try:
+        with open(
+            get_search_index_path(collection), "r", encoding="utf8"
+        ) as opened_file:
+            if opened_file.readline() != SEARCH_INDEX_HEADER:
+                return None
+            for line in opened_file:
+                if not line.endswith("\n"):
+                    # Partially written line
+                    break
+                entry_number, words = line[:-1].split("\t", 1)
+                search_index.add(int(entry_number), words.split())
+    except (FileNotFoundError, ValueError):
+        return None
+    return search_index
+
+
+def rebuild_search_index(collection):
+    """Index all the entries of a collection from its text file"""
+    storage = get_storage()
+    count = storage.count(collection)
+    search_index = SearchIndex()
+    with open(get_search_index_path(collection), "w", encoding="utf8") as opened_file:
+        opened_file.write(SEARCH_INDEX_HEADER)
+        for start in range(0, count, REBUILD_PAGE_SIZE):
+            entries = storage.page(collection, start, start + REBUILD_PAGE_SIZE)
+            for entry_number, (_, text) in enumerate(entries, start):
+                words = tokenize(text)
+                search_index.add(entry_number, words)
+                opened_file.write(format_line(entry_number, words))
+    return search_index
+
+
+def load_search_index(collection):
+    """Return the search index of a collection, completed with the entries not indexed yet"""
+    with search_lock:
+        count = get_storage().count(collection)
+        search_index = search_indexes.get(collection)
+        if search_index is None:
+            search_index = read_search_index(collection)
+
+        if search_index is None or search_index.max_entry_number >= count:
+            # Missing, corrupted or outdated
+            search_index = rebuild_search_index(collection)
+        elif len(search_index.entry_numbers) < count:
+            # Entries saved without updating the search index
+            missing_entry_numbers = range(search_index.max_entry_number + 1, count)
+            if len(search_index.entry_numbers) <= search_index.max_entry_number:
+                # Entries missing before the last indexed one
+                missing_entry_numbers = [
+                    entry_number
+                    for entry_number in range(count)
+                    if entry_number not in search_index.entry_numbers
+                ]
+            entries = get_storage().get(collection, missing_entry_numbers)
+            with open(
+                get_search_index_path(collection), "a", encoding="utf8"
+            ) as opened_file:
+                for entry_number, (_, text) in zip(missing_entry_numbers, entries):
+                    words = tokenize(text)
+                    search_index.add(entry_number, words)
+                    opened_file.write(format_line(entry_number, words))
+
+        search_indexes[collection] = search_index
+        return search_index
+
+
+def add_to_search_index(collection, entry_number, text):
+    """Index a new entry of a collection"""
+    words = tokenize(text)
+    with search_lock:
+        search_index_path = get_search_index_path(collection)
+        search_index = search_indexes.get(collection)
+        if search_index is None:
+            try:
+                with open(search_index_path, "r", encoding="utf8") as opened_file:
+                    if opened_file.readline() != SEARCH_INDEX_HEADER:
+                        # Invalid, it will be rebuilt when loaded
+                        return
+            except FileNotFoundError:
+                if entry_number != 0:
+                    # The previous entries are not indexed, they will be when loaded
+                    return
+                with open(search_index_path, "w", encoding="utf8") as opened_file:
+                    opened_file.write(SEARCH_INDEX_HEADER)
+        else:
+            search_index.add(entry_number, words)
+
+        with open(search_index_path, "a", encoding="utf8") as opened_file:
+            opened_file.write(format_line(entry_number, words))
+
+
+@traced("search.search", "storage")
+def search(collection, query):
+    """Return the numbers of the entries of a collection matching all the words of the query"""
+    return load_search_index(collection).search(query)
@@ -0,0 +1,159 @@
+"""Pasted images waiting to be saved, kept encoded in memory or in a staging folder
+
+An image is encoded once with the storage profile in the background, its
+pixels are released afterwards. The encoded images are kept in memory until
+STAGING_MEMORY_BUDGET bytes, the next ones are written to a temporary folder
+and moved to the collection when they are saved.
+"""
+
+from atexit import register
+from io import BytesIO
+from os import remove, replace
+from shutil import move, rmtree
+from tempfile import mkdtemp
+from threading import Lock
+from uuid import uuid4
+
+from .blobs import hash_image
+from .configuration import (
+    DEDUPLICATE_IMAGES,
+    IMAGE_PROFILE,
+    LARGE_IMAGE_PIXELS,
+    SAVE_FOLDER,
+    STAGING_FOLDER,
+    STAGING_MEMORY_BUDGET,
+)
+from .encoding import write_image
+from .files import create_full_path, is_file
+from .preview import make_preview
+
+# Bytes of the encoded images kept in memory
+staging_memory = {"size": 0, "folder": None}
+staging_lock = Lock()
+
+
+def get_staging_folder():
+    """Return the staging folder of this process, created on the first use"""
+    with staging_lock:
+        if staging_memory["folder"] is None:
+            # In the save folder, the staged files are moved without copy
+            create_full_path(f"{SAVE_FOLDER}/{STAGING_FOLDER}")
+            staging_memory["folder"] = mkdtemp(dir=f"{SAVE_FOLDER}/{STAGING_FOLDER}")
+            register(rmtree, staging_memory["folder"], True)
+        return staging_memory["folder"]
+
+
+def reserve_memory(size, budget=STAGING_MEMORY_BUDGET):
+    """Count bytes kept in memory, return False if they exceed the budget"""
+    with staging_lock:
+        if staging_memory["size"] + size > budget:
+            return False
+        staging_memory["size"] += size
+        return True
+
+
+def release_memory(size):
+    """Stop counting bytes kept in memory"""
+    with staging_lock:
+        staging_memory["size"] -= size
+
+
+class StagedImage:
+    """A pasted image, encoded with the storage profile before it is saved"""
+
+    def __init__(self, image, profile=IMAGE_PROFILE):
+        self.image = image
+        self.profile = profile
+        self.lock = Lock()
+
+        # Encoded image, in memory or in the staging folder
+        self.data = None
+        self.path = None
+        # Hash of the pixels for the deduplication
+        self.digest = None
+        # File written by the last save, moved again if the save is retried
+        self.saved_path = None
+
+        # Computed once from the pixels, also used for the thumbnail,
+        # in the background for the large images
+        self.preview = None
+        if image.width * image.height <= LARGE_IMAGE_PIXELS:
+            self.preview = make_preview(image)
+
+    def get_preview(self):
+        """Return the preview of the image, computed on the first call"""
+        with self.lock:
+            if self.preview is None and self.image is not None:
+                self.preview = make_preview(self.image)
+            return self.preview
+
+    def stage(self):
+        """Encode the image and release its pixels, can be executed in another thread"""
+        with self.lock:
+            if self.image is None:
+                return
+            if self.preview is None:
+                self.preview = make_preview(self.image)
+            if DEDUPLICATE_IMAGES:
+                self.digest = hash_image(self.image)
+
+            encoded_image = BytesIO()
+            write_image(self.image, encoded_image, self.profile)
+            data = encoded_image.getvalue()
+            self.image = None
+
+            if not reserve_memory(len(data)):
+                # Over the budget, the image waits in a file
+                staged_path = f"{get_staging_folder()}/{uuid4().hex}"
+                try:
+                    with open(staged_path, "wb") as opened_file:
+                        opened_file.write(data)
+                    self.path = staged_path
+                    return
+                except OSError as error:
+                    print(f"Cannot stage the image.\n{error}")
+                    reserve_memory(len(data), float("inf"))
+            self.data = data
+
+    def get_digest(self):
+        """Return the hash of the pixels of the image"""
+        self.stage()
+        return self.digest
+
+    def save_to(self, image_path):
+        """Move the encoded image to its file, without encoding it again"""
+        self.stage()
+        with self.lock:
+            # A file written by a failed save is reused for the retry
+            source_path = self.path or self.saved_path
+            if source_path is not None and is_file(source_path):
+                move(source_path, image_path)
+                self.path = None
+            else:
+                # Write to a temporary file first so an image file is never partial
+                temporary_path = f"{image_path}.tmp"
+                with open(temporary_path, "wb") as opened_file:
+                    opened_file.write(self.data)
+                replace(temporary_path, image_path)
+            self.saved_path = image_path
+
+    def discard(self):
+        """Release the memory and the file of the image"""
+        with self.lock:
+            self.image = None
+            if self.data is not None:
+                release_memory(len(self.data))
+                self.data = None
+            if self.path is not None:
+                try:
+                    remove(self.path)
+                except OSError as error:
+                    print(f"Cannot delete the staged image.\n{error}")
+                self.path = None
+
+
+def discard_images(images):
+    """Release the staged images of a list of images"""
+    for image in images:
+        if isinstance(image, StagedImage):
+            image.discard()
@@ -0,0 +1,435 @@
+"""Storage of the entries of the collections, in text files or in a database"""
+
+from os import path, replace
+from re import fullmatch
+from threading import Lock
+
+from .configuration import (
+    LOG_FILE_NAME,
+    SAVE_FOLDER,
+    SQLITE_DATABASE_FILE_NAME,
+    SQLITE_STORE_IMAGES,
+    STORAGE_BACKEND,
+    TEXT_IMAGE_SEPARATOR,
+    TEXT_MARKER,
+    TEXT_SEPARATOR,
+)
+from .entry_log import LOG_MAGIC, encode_record
+from .files import create_full_path, is_file, list_folders
+from .load import get_image_path, load_entries
+from .text_index import (
+    append_index,
+    follow_index,
+    get_index_count,
+    get_text_path,
+    read_index,
+    read_index_range,
+    read_index_records,
+)
+
+# Maximum number of parameters of a query, the oldest SQLite versions accept 999
+SQLITE_MAX_PARAMETERS = 999
+# Entries loaded at once while migrating
+MIGRATION_PAGE_SIZE = 1000
+
+# Storage used by the application, created on the first use
+storage = None  # pylint: disable=invalid-name
+storage_lock = Lock()
+
+
+class StorageError(Exception):
+    """An entry cannot be written to the storage"""
+
+
+class Storage:
+    """Entries of the collections, numbered from 0 in the order they were saved
+
+    An entry is a tuple (image names, text), like the ones returned by load().
+    """
+
+    def collections(self):
+        """Return the names of the collections containing entries"""
+        raise NotImplementedError
+
+    def append(self, collection, image_names, text, time=None):
+        """Add an entry at the end of a collection
+
+        Return the number of the entry, None if it is not known yet.
+        """
+        raise NotImplementedError
+
+    def count(self, collection):
+        """Return the number of entries of a collection"""
+        raise NotImplementedError
+
+    def image_counts(self, collection):
+        """Return the number of images of each entry of a collection"""
+        raise NotImplementedError
+
+    def follow(self, collection, cursor=None):
+        """Return the entries appended to a collection since a previous call
+
+        Return a cursor for the next call, the image counts of the new entries
+        and the number of the first one. The number is 0 when all the entries
+        are returned, without a cursor or when the collection was rewritten.
+        """
+        del cursor
+        return None, self.image_counts(collection), 0
+
+    def page(self, collection, start, stop):
+        """Return the entries of a collection from number start to number stop (excluded)"""
+        raise NotImplementedError
+
+    def get(self, collection, entry_numbers):
+        """Return the entries of a collection with the given numbers, in the same order"""
+        raise NotImplementedError
+
+    def read_image(self, collection, image_name):
+        """Return the content of an image stored with the entries, None if it is not"""
+        del collection, image_name
+
+    def close(self):
+        """Release the resources of the storage"""
+
+
+class FileStorage(Storage):
+    """Entries in the text file or the entry log of each collection, with its binary index"""
+
+    def collections(self):
+        return list_folders(SAVE_FOLDER)
+
+    def append(self, collection, image_names, text, time=None):
+        del time
+        text_file = get_text_path(collection)
+        if path.basename(text_file) == LOG_FILE_NAME:
+            offset, length = add_record(text_file, encode_record(image_names, text))
+        else:
+            offset, length = add_text(text_file, format_entry(image_names, text))
+
+        # Keep the index of the entries up to date
+        try:
+            return append_index(collection, offset, length, len(image_names))
+        except OSError as error:
+            print(f"Cannot update the index.\n{error}")
+            return None
+
+    def count(self, collection):
+        count = get_index_count(collection)
+        return len(read_index(collection)) if count is None else count
+
+    def image_counts(self, collection):
+        return [image_count for _, _, image_count in read_index(collection)]
+
+    def follow(self, collection, cursor=None):
+        cursor, records, start = follow_index(collection, cursor)
+        return cursor, [image_count for _, _, image_count in records], start
+
+    def page(self, collection, start, stop):
+        return load_entries(collection, read_index_range(collection, start, stop))
+
+    def get(self, collection, entry_numbers):
+        return load_entries(collection, read_index_records(collection, entry_numbers))
+
+
+class SQLiteStorage(Storage):
+    """Entries in a SQLite database shared by all the collections
+
+    The images are still saved in the collection folders, a copy of each
+    image can also be stored in the database.
+    """
+
+    def __init__(self, database_path, store_images=SQLITE_STORE_IMAGES):
+        self.database_path = database_path
+        self.store_images = store_images
+        self.connection = None
+        # The connection is shared by the threads, one query at a time
+        self.lock = Lock()
+
+    def connect(self):
+        """Return the connection to the database, created on the first use"""
+        if self.connection is None:
+            # Only imported when a database is used, it is slow to import
+            import sqlite3  # pylint: disable=import-outside-toplevel
+
+            self.connection = sqlite3.connect(
+                self.database_path, check_same_thread=False
+            )
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    collection TEXT NOT NULL,
+                    number INTEGER NOT NULL,
+                    time TEXT,
+                    text TEXT NOT NULL,
+                    image_count INTEGER NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS entries_number
+                    ON entries (collection, number);
+                CREATE INDEX IF NOT EXISTS entries_time
+                    ON entries (collection, time);
+                CREATE TABLE IF NOT EXISTS images (
+                    entry_id INTEGER NOT NULL REFERENCES entries (id),
+                    position INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    data BLOB,
+                    PRIMARY KEY (entry_id, position)
+                );
+                """)
+        return self.connection
+
+    def read_image_names(self, connection, entry_ids):
+        """Return the image names of each entry id"""
+        image_names = {entry_id: [] for entry_id in entry_ids}
+        for index in range(0, len(entry_ids), SQLITE_MAX_PARAMETERS):
+            chunk = entry_ids[index : index + SQLITE_MAX_PARAMETERS]
+            for entry_id, name in connection.execute(
+                "SELECT entry_id, name FROM images"
+                f" WHERE entry_id IN ({', '.join('?' * len(chunk))})"
+                " ORDER BY entry_id, position",
+                chunk,
+            ):
+                image_names[entry_id].append(name)
+        return image_names
+
+    def read_entries(self, connection, rows):
+        """Return the entries of the rows (id, number, text)"""
+        image_names = self.read_image_names(connection, [row[0] for row in rows])
+        # An entry without image has an empty name, like in the text files
+        return [(image_names[entry_id] or [""], text) for entry_id, _, text in rows]
+
+    def collections(self):
+        with self.lock:
+            return [
+                collection
+                for (collection,) in self.connect().execute(
+                    "SELECT DISTINCT collection FROM entries"
+                )
+            ]
+
+    def append(self, collection, image_names, text, time=None):
+        image_names = [name for name in image_names if len(name) > 0]
+        images = []
+        for position, image_name in enumerate(image_names):
+            data = None
+            if self.store_images:
+                try:
+                    with open(get_image_path(collection, image_name), "rb") as image:
+                        data = image.read()
+                except OSError as error:
+                    print(f"Cannot store the image in the database.\n{error}")
+            images.append((position, image_name, data))
+
+        with self.lock:
+            connection = self.connect()
+            try:
+                with connection:
+                    (number,) = connection.execute(
+                        "SELECT COALESCE(MAX(number) + 1, 0) FROM entries"
+                        " WHERE collection = ?",
+                        (collection,),
+                    ).fetchone()
+                    entry_id = connection.execute(
+                        "INSERT INTO entries"
+                        " (collection, number, time, text, image_count)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (collection, number, time, text, len(image_names)),
+                    ).lastrowid
+                    connection.executemany(
+                        "INSERT INTO images (entry_id, position, name, data)"
+                        " VALUES (?, ?, ?, ?)",
+                        [(entry_id, *image) for image in images],
+                    )
+            except connection.Error as error:
+                raise StorageError(error) from error
+            return number
+
+    def count(self, collection):
+        with self.lock:
+            return (
+                self.connect()
+                .execute(
+                    "SELECT COUNT(*) FROM entries WHERE collection = ?", (collection,)
+                )
+                .fetchone()[0]
+            )
+
+    def image_counts(self, collection):
+        with self.lock:
+            return [
+                image_count
+                for (image_count,) in self.connect().execute(
+                    "SELECT image_count FROM entries WHERE collection = ?"
+                    " ORDER BY number",
+                    (collection,),
+                )
+            ]
+
+    def follow(self, collection, cursor=None):
+        # The entries are only appended, the cursor is the number of entries read
+        start = cursor or 0
+        with self.lock:
+            rows = (
+                self.connect()
+                .execute(
+                    "SELECT number, image_count FROM entries"
+                    " WHERE collection = ? AND number >= ? ORDER BY number",
+                    (collection, start),
+                )
+                .fetchall()
+            )
+        if start > 0 and len(rows) > 0 and rows[0][0] != start:
+            # Rewritten collection
+            return self.follow(collection)
+        return start + len(rows), [image_count for _, image_count in rows], start
+
+    def page(self, collection, start, stop):
+        with self.lock:
+            connection = self.connect()
+            rows = connection.execute(
+                "SELECT id, number, text FROM entries"
+                " WHERE collection = ? AND number >= ? AND number < ?"
+                " ORDER BY number",
+                (collection, start, stop),
+            ).fetchall()
+            return self.read_entries(connection, rows)
+
+    def get(self, collection, entry_numbers):
+        entry_numbers = list(entry_numbers)
+        with self.lock:
+            connection = self.connect()
+            rows = {}
+            for index in range(0, len(entry_numbers), SQLITE_MAX_PARAMETERS - 1):
+                chunk = entry_numbers[index : index + SQLITE_MAX_PARAMETERS - 1]
+                for row in connection.execute(
+                    "SELECT id, number, text FROM entries WHERE collection = ?"
+                    f" AND number IN ({', '.join('?' * len(chunk))})",
+                    (collection, *chunk),
+                ):
+                    rows[row[1]] = row
+            return self.read_entries(
+                connection,
+                [rows[number] for number in entry_numbers if number in rows],
+            )
+
+    def read_image(self, collection, image_name):
+        """Return the content of an image file stored in the database, None if it is not"""
+        with self.lock:
+            row = (
+                self.connect()
+                .execute(
+                    "SELECT images.data FROM images"
+                    " JOIN entries ON entries.id = images.entry_id"
+                    " WHERE entries.collection = ? AND images.name = ?"
+                    " AND images.data IS NOT NULL LIMIT 1",
+                    (collection, image_name),
+                )
+                .fetchone()
+            )
+            return None if row is None else row[0]
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+def format_entry(image_names, text):
+    """Return an entry in the format of the version 1 of the text file"""
+    text_to_save = (
+        f"{TEXT_MARKER}{TEXT_IMAGE_SEPARATOR.join(image_names)}"
+        f"{TEXT_SEPARATOR}{text}"
+    )
+    if text_to_save[-1] != "\n":
+        text_to_save += "\n"
+    return text_to_save
+
+
+def add_record(file, record):
+    """Append a record to an entry log, return the byte offset and length of the record"""
+    with open(file, "ab") as opened_file:
+        if opened_file.tell() == 0:
+            opened_file.write(LOG_MAGIC)
+        offset = opened_file.tell()
+        opened_file.write(record)
+        opened_file.flush()
+        return offset, len(record)
+
+
+def add_text(file, text):
+    """Append text to a file, return the byte offset and length of the written text"""
+    with open(file, "a", encoding="utf8") as opened_file:
+        offset = opened_file.tell()
+        opened_file.write(text)
+        opened_file.flush()
+        return offset, opened_file.tell() - offset
+
+
+def create_storage(backend=STORAGE_BACKEND):
+    """Return a new storage of a backend, "files" or "sqlite" """
+    if backend == "sqlite":
+        create_full_path(SAVE_FOLDER)
+        return SQLiteStorage(f"{SAVE_FOLDER}/{SQLITE_DATABASE_FILE_NAME}")
+    return FileStorage()
+
+
+def get_storage():
+    """Return the storage of the application"""
+    global storage  # pylint: disable=global-statement
+    with storage_lock:
+        if storage is None:
+            storage = create_storage()
+        return storage
+
+
+def restore_image(collection, image_name):
+    """Write an image file missing from the save folder from its copy in the storage
+
+    Return the path of the image, the file does not exist if there is no copy.
+    """
+    image_path = get_image_path(collection, image_name)
+    if is_file(image_path):
+        return image_path
+    data = get_storage().read_image(collection, image_name)
+    if data is None:
+        return image_path
+
+    create_full_path(path.dirname(image_path))
+    # Write to a temporary file first so an image file is never partial
+    temporary_path = f"{image_path}.tmp"
+    try:
+        with open(temporary_path, "wb") as opened_file:
+            opened_file.write(data)
+        replace(temporary_path, image_path)
+    except OSError as error:
+        print(f"Cannot restore the image.\n{error}")
+    return image_path
+
+
+def guess_time(image_names):
+    """Return the saving time of an entry from the names of its images, None if unknown"""
+    for image_name in image_names:
+        # Images named by save are prefixed with the time "YYYY-MM-DD_HH-MM-SS"
+        if fullmatch(r"\d{4}-\d\d-\d\d_\d\d-\d\d-\d\d(_\d+)?(\.\w+)?", image_name):
+            return image_name[:19]
+    return None
+
+
+def migrate(source, target, collections=None):
+    """Copy the entries of collections to another storage, return the number copied
+
+    The entries already in the target are skipped, so an interrupted
+    migration can be resumed.
+    """
+    copied = 0
+    for collection in source.collections() if collections is None else collections:
+        create_full_path(f"{SAVE_FOLDER}/{collection}")
+        count = source.count(collection)
+        for start in range(target.count(collection), count, MIGRATION_PAGE_SIZE):
+            for image_names, text in source.page(
+                collection, start, min(count, start + MIGRATION_PAGE_SIZE)
+            ):
+                image_names = [name for name in image_names if len(name) > 0]
+                target.append(collection, image_names, text, guess_time(image_names))
+                copied += 1
+    return copied
@@ -0,0 +1,302 @@
+"""Binary index of the entries positions in the text file of a collection"""
+
+from os import path, stat
+from struct import Struct
+from threading import Lock
+
+from .configuration import (
+    LOG_FILE_NAME,
+    SAVE_FOLDER,
+    TEXT_FILE_NAME,
+    TEXT_FILE_VERSION,
+    TEXT_IMAGE_SEPARATOR,
+    TEXT_INDEX_FILE_NAME,
+    TEXT_MARKER,
+    TEXT_SEPARATOR,
+)
+from .entry_log import LOG_MAGIC, get_file_version, is_log, iter_records
+from .files import is_file, map_file
+from .tracing import traced
+
+INDEX_MAGIC = b"NSI1"
+# Byte offset, byte length and number of images of an entry
+INDEX_RECORD = Struct("<QII")
+
+ENCODED_MARKER = TEXT_MARKER.encode("utf8")
+ENCODED_SEPARATOR = TEXT_SEPARATOR.encode("utf8")
+ENCODED_IMAGE_SEPARATOR = TEXT_IMAGE_SEPARATOR.encode("utf8")
+
+# Only one thread at a time can write an index
+index_lock = Lock()
+
+
+def get_index_path(collection):
+    """Return the path of the index of a collection"""
+    return f"{SAVE_FOLDER}/{collection}/{TEXT_INDEX_FILE_NAME}"
+
+
+def get_text_path(collection):
+    """Return the path of the text file of a collection, its entry log if it has one"""
+    log_path = f"{SAVE_FOLDER}/{collection}/{LOG_FILE_NAME}"
+    if is_file(log_path):
+        return log_path
+    text_path = f"{SAVE_FOLDER}/{collection}/{TEXT_FILE_NAME}"
+    if TEXT_FILE_VERSION == 2 and not is_file(text_path):
+        # New collection
+        return log_path
+    return text_path
+
+
+def get_entries_start(text_file):
+    """Return the byte offset of the first entry of a text file"""
+    return len(LOG_MAGIC) if get_file_version(text_file) == 2 else 0
+
+
+def count_images(image_names):
+    """Return the number of image names in the encoded first line of an entry"""
+    image_names = image_names.rstrip(b"\r")
+    if len(image_names) == 0:
+        return 0
+    return len(
+        [name for name in image_names.split(ENCODED_IMAGE_SEPARATOR) if len(name) > 0]
+    )
+
+
+def scan_entries(file, start=0):
+    """Return the records of the entries in a text file from a byte offset"""
+    records = []
+    data = map_file(file)
+    if data is None:
+        return records
+    with data:
+        if is_log(data):
+            return list(iter_records(data, start))
+        end = len(data)
+        offset = data.find(ENCODED_MARKER, start)
+        while offset != -1:
+            next_offset = data.find(ENCODED_MARKER, offset + len(ENCODED_MARKER))
+            entry_end = end if next_offset == -1 else next_offset
+
+            # The image names are on the first line of the entry
+            names_start = offset + len(ENCODED_MARKER)
+            names_end = data.find(ENCODED_SEPARATOR, names_start, entry_end)
+            if names_end == -1:
+                names_end = entry_end
+
+            records.append(
+                (
+                    offset,
+                    entry_end - offset,
+                    count_images(data[names_start:names_end]),
+                )
+            )
+            offset = next_offset
+    return records
+
+
+def read_records(index_file):
+    """Return the records stored in an index file, None if it is invalid"""
+    try:
+        with open(index_file, "rb") as opened_file:
+            content = opened_file.read()
+    except FileNotFoundError:
+        return None
+    if content[: len(INDEX_MAGIC)] != INDEX_MAGIC:
+        return None
+    content = content[len(INDEX_MAGIC) :]
+    # Ignore a partially written record
+    content = content[: len(content) - len(content) % INDEX_RECORD.size]
+    return list(INDEX_RECORD.iter_unpack(content))
+
+
+def write_records(index_file, records, append):
+    """Write records at the end of an index file or replace its content"""
+    with open(index_file, "ab" if append else "wb") as opened_file:
+        if not append:
+            opened_file.write(INDEX_MAGIC)
+        for record in records:
+            opened_file.write(INDEX_RECORD.pack(*record))
+
+
+def records_end(records, start=0):
+    """Return the byte offset after the last indexed entry"""
+    if len(records) == 0:
+        return start
+    offset, length, _ = records[-1]
+    return offset + length
+
+
+@traced("text_index.read_index", "storage")
+def read_index(collection):
+    """Return the records (offset, length, image count) of the entries of a collection
+
+    The index is created or completed if the text file was modified without it.
+    """
+    text_file = get_text_path(collection)
+    index_file = get_index_path(collection)
+    try:
+        text_size = path.getsize(text_file)
+    except OSError:
+        return []
+    start = get_entries_start(text_file)
+
+    with index_lock:
+        records = read_records(index_file)
+        if records is not None and records_end(records, start) == text_size:
+            return records
+
+        if records is not None and 0 < records_end(records, start) < text_size:
+            # Entries were appended without updating the index
+            new_records = scan_entries(text_file, records_end(records, start))
+            if len(new_records) > 0 and new_records[0][0] == records_end(
+                records, start
+            ):
+                write_records(index_file, new_records, True)
+                return records + new_records
+
+        # Missing, outdated or corrupted index
+        records = scan_entries(text_file)
+        try:
+            write_records(index_file, records, False)
+        except OSError as error:
+            print(f"Cannot save the index.\n{error}")
+        return records
+
+
+def follow_index(collection, cursor=None):
+    """Return a cursor at the end of the text file of a collection and the new records
+
+    The cursor (file path, device, inode, byte offset, entry count) of a
+    previous call is used to read only the entries appended since. Return
+    the cursor, the records and the number of their first entry, 0 when the
+    file was replaced or modified and all the records are returned.
+    """
+    text_file = get_text_path(collection)
+    try:
+        file_stat = stat(text_file)
+    except OSError:
+        # No entry yet, the file is read when it is created
+        return (text_file, None, None, 0, 0), [], 0
+    identity = (text_file, file_stat.st_dev, file_stat.st_ino)
+
+    if cursor is not None and cursor[:3] == identity and cursor[3] <= file_stat.st_size:
+        offset, count = cursor[3:]
+        if offset == file_stat.st_size:
+            return cursor, [], count
+        # Only the tail is parsed, it must start with a new entry
+        records = scan_entries(text_file, offset)
+        if len(records) == 0 or records[0][0] == offset:
+            end = records_end(records, offset)
+            return (*identity, end, count + len(records)), records, count
+
+    records = read_index(collection)
+    start = get_entries_start(text_file)
+    return (*identity, records_end(records, start), len(records)), records, 0
+
+
+def read_records_end(index_file, start=0):
+    """Return the byte offset after the last entry of an index file, None if it is invalid"""
+    try:
+        with open(index_file, "rb") as opened_file:
+            if opened_file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                return None
+            records_size = path.getsize(index_file) - len(INDEX_MAGIC)
+            if records_size % INDEX_RECORD.size != 0:
+                return None
+            if records_size == 0:
+                return start
+            # Only the last record is read
+            opened_file.seek(-INDEX_RECORD.size, 2)
+            return records_end([INDEX_RECORD.unpack(opened_file.read())])
+    except FileNotFoundError:
+        return None
+
+
+def get_index_count(collection):
+    """Return the number of entries of a collection, None if its index cannot be saved
+
+    The count is derived from the size of the index, which is created or
+    completed first if the text file was modified without it.
+    """
+    text_file = get_text_path(collection)
+    index_file = get_index_path(collection)
+    try:
+        text_size = path.getsize(text_file)
+    except OSError:
+        return 0
+    start = get_entries_start(text_file)
+
+    for attempt in range(2):
+        if attempt > 0:
+            read_index(collection)
+        with index_lock:
+            if read_records_end(index_file, start) == text_size:
+                return (
+                    path.getsize(index_file) - len(INDEX_MAGIC)
+                ) // INDEX_RECORD.size
+    return None
+
+
+def read_index_records(collection, entry_numbers):
+    """Return the records of some entries of a collection, the invalid numbers are skipped
+
+    Only the needed records are read, at their position in the index.
+    """
+    count = get_index_count(collection)
+    if count is None:
+        records = read_index(collection)
+        return [
+            records[number] for number in entry_numbers if 0 <= number < len(records)
+        ]
+
+    records = []
+    with index_lock, open(get_index_path(collection), "rb") as opened_file:
+        for number in entry_numbers:
+            if 0 <= number < count:
+                opened_file.seek(len(INDEX_MAGIC) + number * INDEX_RECORD.size)
+                record = opened_file.read(INDEX_RECORD.size)
+                if len(record) < INDEX_RECORD.size:
+                    # The index was rebuilt meanwhile
+                    break
+                records.append(INDEX_RECORD.unpack(record))
+    return records
+
+
+def read_index_range(collection, start, stop):
+    """Return the records of the entries start to stop (excluded) of a collection
+
+    Only the needed records are read, in one block of the index.
+    """
+    count = get_index_count(collection)
+    if count is None:
+        return read_index(collection)[start:stop]
+
+    start = min(max(start, 0), count)
+    stop = min(max(stop, start), count)
+    with index_lock, open(get_index_path(collection), "rb") as opened_file:
+        opened_file.seek(len(INDEX_MAGIC) + start * INDEX_RECORD.size)
+        content = opened_file.read((stop - start) * INDEX_RECORD.size)
+    # The index may have been rebuilt meanwhile
+    content = content[: len(content) - len(content) % INDEX_RECORD.size]
+    return list(INDEX_RECORD.iter_unpack(content))
+
+
+def append_index(collection, offset, length, image_count):
+    """Add the record of an entry appended to the text file of a collection
+
+    Return the number of the entry, None if the index is not up to date.
+    """
+    index_file = get_index_path(collection)
+    start = get_entries_start(get_text_path(collection))
+    with index_lock:
+        indexed_end = read_records_end(index_file, start)
+        if indexed_end == offset:
+            write_records(index_file, [(offset, length, image_count)], True)
+        elif indexed_end is None and offset == start:
+            # First entry of the collection
+            write_records(index_file, [(offset, length, image_count)], False)
+        else:
+            # The index is not up to date, it will be rebuilt when read
+            return None
+        records_size = path.getsize(index_file) - len(INDEX_MAGIC)
+        return records_size // INDEX_RECORD.size - 1
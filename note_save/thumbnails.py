@@ -0,0 +1,132 @@
+"""Thumbnail cache for the images of the collections"""
+
+from hashlib import sha1
+from os import remove, replace, scandir, stat, utime
+
+from PIL import Image
+
+from .configuration import (
+    SAVE_FOLDER,
+    THUMBNAIL_CACHE_MAX_SIZE,
+    THUMBNAIL_EXTENSION,
+    THUMBNAIL_EXTENSION_TYPE,
+    THUMBNAIL_FOLDER,
+)
+from .files import create_full_path, is_file
+from .preview import make_preview
+from .tracing import traced
+
+
+def get_thumbnail_folder(collection):
+    """Return the hidden folder containing the thumbnails of a collection"""
+    return f"{SAVE_FOLDER}/{collection}/{THUMBNAIL_FOLDER}"
+
+
+def get_thumbnail_path(collection, image_path):
+    """Return the thumbnail path of an image, None if the image does not exist
+
+    The name depends on the path, modification time and size of the image,
+    so a modified image never uses an outdated thumbnail.
+    """
+    try:
+        image_stat = stat(image_path)
+    except OSError:
+        return None
+    key = sha1(
+        f"{image_path}|{image_stat.st_mtime_ns}|{image_stat.st_size}".encode("utf8")
+    ).hexdigest()
+    return f"{get_thumbnail_folder(collection)}/{key}{THUMBNAIL_EXTENSION}"
+
+
+@traced("thumbnails.create_thumbnail", "image")
+def create_thumbnail(collection, image_path, image=None):
+    """Create the thumbnail of an image and return it, None on failure
+
+    The already opened image can be given to avoid decoding it again.
+    """
+    thumbnail_path = get_thumbnail_path(collection, image_path)
+    if thumbnail_path is None:
+        return None
+
+    try:
+        if image is None:
+            with Image.open(image_path) as opened_image:
+                thumbnail = make_preview(opened_image, opened_for_preview=True)
+        else:
+            thumbnail = make_preview(image)
+    except (
+        Image.UnidentifiedImageError,
+        Image.DecompressionBombError,
+        OSError,
+    ) as error:
+        # Also an image saved before the pixel limit of the ingest was lowered
+        print(f"Cannot create the thumbnail.\n{error}")
+        return None
+
+    create_full_path(get_thumbnail_folder(collection))
+    # Write to a temporary file first so readers never see a partial thumbnail
+    temporary_path = f"{thumbnail_path}.tmp"
+    try:
+        thumbnail.save(temporary_path, THUMBNAIL_EXTENSION_TYPE)
+        replace(temporary_path, thumbnail_path)
+    except OSError as error:
+        print(f"Cannot save the thumbnail.\n{error}")
+
+    return thumbnail
+
+
+def ensure_thumbnail(collection, image_path, image=None):
+    """Create the thumbnail of an image if it does not exist yet"""
+    thumbnail_path = get_thumbnail_path(collection, image_path)
+    if thumbnail_path is not None and not is_file(thumbnail_path):
+        create_thumbnail(collection, image_path, image)
+
+
+@traced("thumbnails.get_thumbnail", "image")
+def get_thumbnail(collection, image_path):
+    """Return the thumbnail of an image, creating it on the first view"""
+    thumbnail_path = get_thumbnail_path(collection, image_path)
+    if thumbnail_path is None:
+        return None
+
+    if is_file(thumbnail_path):
+        try:
+            with Image.open(thumbnail_path) as opened_thumbnail:
+                opened_thumbnail.load()
+                thumbnail = opened_thumbnail
+            # Mark the thumbnail as recently used for the eviction
+            utime(thumbnail_path)
+            return thumbnail
+        except (Image.UnidentifiedImageError, OSError):
+            # Corrupted or removed meanwhile, create it again
+            pass
+
+    return create_thumbnail(collection, image_path)
+
+
+def evict_thumbnails(collection, max_size=THUMBNAIL_CACHE_MAX_SIZE):
+    """Delete the least recently used thumbnails until the cache fits in max_size bytes"""
+    try:
+        with scandir(get_thumbnail_folder(collection)) as entries:
+            thumbnails = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in entries
+                if entry.is_file()
+            ]
+    except OSError:
+        return
+
+    total_size = sum(size for _, size, _ in thumbnails)
+    if total_size <= max_size:
+        return
+
+    # Oldest first
+    thumbnails.sort()
+    for _, size, thumbnail_path in thumbnails:
+        try:
+            remove(thumbnail_path)
+        except OSError:
+            continue
+        total_size -= size
+        if total_size <= max_size:
+            break
@@ -0,0 +1,121 @@
+"""Timing of the slow parts of the application, exported as a Chrome trace
+
+Set the environment variable NOTE_SAVE_TRACE to a file path to record the
+spans, the file is written when the application exits and can be opened in
+chrome://tracing or https://ui.perfetto.dev. Without the variable the spans
+do nothing and the decorators return the functions unchanged.
+"""
+
+from atexit import register
+from contextlib import nullcontext
+from functools import wraps
+from json import dump
+from os import environ, getpid
+from threading import current_thread, get_ident
+from time import perf_counter_ns
+
+TRACE_ENVIRONMENT_VARIABLE = "NOTE_SAVE_TRACE"
+
+trace_path = environ.get(TRACE_ENVIRONMENT_VARIABLE)
+tracing_enabled = bool(trace_path)
+
+# Chrome trace events, appending to a list is thread-safe
+trace_events = []
+# Names of the threads which recorded events, by thread id
+thread_names = {}
+# Shared span doing nothing when tracing is disabled
+disabled_span = nullcontext()
+
+
+class Span:
+    """A timed section of code recorded as a complete event"""
+
+    __slots__ = ("name", "category", "start")
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *args):
+        end = perf_counter_ns()
+        thread_id = get_ident()
+        if thread_id not in thread_names:
+            thread_names[thread_id] = current_thread().name
+        trace_events.append(
+            {
+                "name": self.name,
+                "cat": self.category,
+                "ph": "X",
+                "ts": self.start / 1000,
+                "dur": (end - self.start) / 1000,
+                "pid": getpid(),
+                "tid": thread_id,
+            }
+        )
+
+
+def span(name, category="app"):
+    """Return a context manager timing a section of code"""
+    if not tracing_enabled:
+        return disabled_span
+    return Span(name, category)
+
+
+def traced(name=None, category="app"):
+    """Decorator timing each call of a function"""
+
+    def decorator(function):
+        if not tracing_enabled:
+            return function
+        span_name = name or function.__qualname__
+
+        @wraps(function)
+        def traced_function(*args, **kwargs):
+            with Span(span_name, category):
+                return function(*args, **kwargs)
+
+        return traced_function
+
+    return decorator
+
+
+def trace_methods(cls, prefix, category="event"):
+    """Time the calls of the methods of a class starting with a prefix"""
+    if not tracing_enabled:
+        return
+    for attribute_name, attribute in list(vars(cls).items()):
+        if attribute_name.startswith(prefix) and callable(attribute):
+            setattr(
+                cls,
+                attribute_name,
+                traced(f"{cls.__name__}.{attribute_name}", category)(attribute),
+            )
+
+
+def write_trace(file=None):
+    """Write the recorded events to a Chrome trace file"""
+    events = [
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": getpid(),
+            "tid": thread_id,
+            "args": {"name": thread_name},
+        }
+        for thread_id, thread_name in thread_names.items()
+    ]
+    events += trace_events
+    try:
+        with open(file or trace_path, "w", encoding="utf8") as opened_file:
+            dump({"traceEvents": events, "displayTimeUnit": "ms"}, opened_file)
+    except OSError as error:
+        print(f"Cannot save the trace.\n{error}")
+
+
+if tracing_enabled:
+    register(write_trace)
@@ -0,0 +1 @@
+"""Tests of Note Save, run without the GUI with python -m unittest"""
@@ -0,0 +1,185 @@
+"""Tests of the placement of the entries in lines and pages"""
+
+from unittest import TestCase, main
+
+from note_save.layout import PageLayout, ReversedLayout
+
+
+def build_layout(image_counts, images_by_line=4, lines_by_page=3):
+    """Return a small layout containing entries with these numbers of images"""
+    layout = PageLayout(images_by_line, lines_by_page)
+    layout.extend(image_counts)
+    return layout
+
+
+class PageLayoutTest(TestCase):
+    """Placement of the entries, appended one by one or by batches"""
+
+    def test_empty(self):
+        """An empty layout has no page and no height"""
+        layout = build_layout([])
+        self.assertEqual(len(layout), 0)
+        self.assertEqual(layout.page_count(), 0)
+        self.assertEqual(layout.height, 0)
+        self.assertEqual(layout.page_at_line(0), 0)
+
+    def test_entries_share_lines(self):
+        """Entries are packed in a line until it is full"""
+        layout = build_layout([0, 1, 2, 1])
+        self.assertEqual(layout.position(0), (0, 0, 1))
+        self.assertEqual(layout.position(1), (0, 1, 1))
+        self.assertEqual(layout.position(2), (0, 2, 2))
+        # The line holds 4 medias, the last entry starts a new line
+        self.assertEqual(layout.position(3), (1, 0, 1))
+        self.assertEqual(layout.height, 2)
+
+    def test_pages(self):
+        """Lines are packed in pages until a page is full"""
+        layout = build_layout([4] * 7)
+        self.assertEqual(layout.page_count(), 3)
+        self.assertEqual(layout.page_range(0), (0, 3))
+        self.assertEqual(layout.page_range(1), (3, 6))
+        self.assertEqual(layout.page_range(2), (6, 7))
+        self.assertEqual(layout.position(4), (1, 0, 4))
+        self.assertEqual(layout.page_of(6), 2)
+        self.assertEqual(layout.page_height(2), 1)
+
+    def test_entry_wider_than_line(self):
+        """An entry with more medias than a line takes several lines"""
+        layout = build_layout([1, 9, 1])
+        self.assertEqual(layout.page_height(0), 1)
+        # 9 medias take 3 lines, they do not fit after the first line
+        self.assertEqual(layout.position(1), (0, 0, 9))
+        self.assertEqual(layout.page_range(0), (0, 1))
+        self.assertEqual(layout.page_range(1), (1, 2))
+        self.assertEqual(layout.page_height(1), 3)
+        # The next entry does not share the last line of the wide entry
+        self.assertEqual(layout.position(2), (0, 0, 1))
+        self.assertEqual(layout.page_of(2), 2)
+        self.assertEqual(layout.height, 5)
+
+    def test_entry_taller_than_page(self):
+        """An entry taller than a page gets a page of its own"""
+        layout = build_layout([1, 20, 1])
+        self.assertEqual(layout.page_count(), 3)
+        self.assertEqual(layout.page_range(1), (1, 2))
+        self.assertEqual(layout.page_height(1), 5)
+        self.assertEqual(layout.position(1), (0, 0, 20))
+        self.assertEqual(layout.page_range(2), (2, 3))
+        self.assertEqual(layout.height, 7)
+
+    def test_page_at_line(self):
+        """The page of a line counted from the first page"""
+        layout = build_layout([1, 20, 1])
+        self.assertEqual(layout.page_at_line(0), 0)
+        self.assertEqual(layout.page_at_line(1), 1)
+        self.assertEqual(layout.page_at_line(5), 1)
+        self.assertEqual(layout.page_at_line(6), 2)
+        # After the last line
+        self.assertEqual(layout.page_at_line(100), 2)
+
+    def test_append_matches_extend(self):
+        """Entries appended one by one are placed like a batch"""
+        image_counts = [0, 3, 1, 12, 2, 2, 0, 5, 1, 1, 1, 1, 7, 0]
+        extended = build_layout(image_counts[:5])
+        extended.extend(image_counts[5:])
+        appended = build_layout([])
+        for image_count in image_counts:
+            appended.append(image_count)
+        reference = build_layout(image_counts)
+
+        for layout in (extended, appended):
+            self.assertEqual(layout.page_count(), reference.page_count())
+            self.assertEqual(layout.height, reference.height)
+            for page in range(reference.page_count()):
+                self.assertEqual(layout.page_range(page), reference.page_range(page))
+            for index in range(len(reference)):
+                self.assertEqual(layout.position(index), reference.position(index))
+
+    def test_append_to_last_page(self):
+        """An appended entry completes the last page before starting a new one"""
+        layout = build_layout([4, 4])
+        self.assertEqual(layout.page_range(0), (0, 2))
+        layout.append(1)
+        self.assertEqual(layout.page_range(0), (0, 3))
+        self.assertEqual(layout.page_count(), 1)
+        layout.append(0)
+        self.assertEqual(layout.position(3), (2, 1, 1))
+        layout.append(4)
+        self.assertEqual(layout.page_count(), 2)
+        self.assertEqual(layout.page_range(1), (4, 5))
+
+
+class ReversedLayoutTest(TestCase):
+    """Placement of the entries displayed from the last one"""
+
+    image_counts = [0, 3, 1, 12, 2, 2, 0, 5, 1, 1, 1, 1, 7, 0, 2]
+
+    def test_pages_in_reverse_order(self):
+        """The last page is displayed first, the indexes count from the last entry"""
+        layout = build_layout(self.image_counts)
+        reversed_layout = ReversedLayout(layout)
+        count = len(layout)
+        self.assertEqual(reversed_layout.page_count(), layout.page_count())
+        for page in range(layout.page_count()):
+            start, end = layout.page_range(page)
+            reversed_page = layout.page_count() - 1 - page
+            self.assertEqual(
+                reversed_layout.page_range(reversed_page), (count - end, count - start)
+            )
+            self.assertEqual(
+                reversed_layout.page_height(reversed_page), layout.page_height(page)
+            )
+            for index in range(count - end, count - start):
+                self.assertEqual(reversed_layout.page_of(index), reversed_page)
+
+    def test_reading_order(self):
+        """The entries of a page are read by line then column from the last entry"""
+        reversed_layout = ReversedLayout(build_layout(self.image_counts))
+        for page in range(reversed_layout.page_count()):
+            start, end = reversed_layout.page_range(page)
+            positions = [
+                reversed_layout.position(index)[:2] for index in range(start, end)
+            ]
+            self.assertEqual(positions, sorted(positions))
+            # The first entry of each line is in the column 0
+            lines = [line for line, _ in positions]
+            for (line, column), previous_line in zip(positions, [None] + lines):
+                self.assertEqual(column == 0, line != previous_line)
+
+    def test_entry_taller_than_page(self):
+        """An entry taller than a page starts at the top of its own page"""
+        reversed_layout = ReversedLayout(build_layout([1, 20, 1]))
+        self.assertEqual(reversed_layout.page_range(1), (1, 2))
+        self.assertEqual(reversed_layout.position(1), (0, 0, 20))
+        self.assertEqual(reversed_layout.page_at_line(0), 0)
+        self.assertEqual(reversed_layout.page_at_line(1), 1)
+        self.assertEqual(reversed_layout.page_at_line(5), 1)
+        self.assertEqual(reversed_layout.page_at_line(6), 2)
+        self.assertEqual(reversed_layout.page_at_line(100), 2)
+
+    def test_lines_in_reverse_order(self):
+        """The last line of a page is displayed first"""
+        reversed_layout = ReversedLayout(build_layout([1, 1, 9, 2, 2]))
+        # The lines of the pages are [1, 1], [9] (3 lines), [2, 2]
+        self.assertEqual(reversed_layout.page_range(0), (0, 2))
+        self.assertEqual(reversed_layout.position(0), (0, 0, 2))
+        self.assertEqual(reversed_layout.position(1), (0, 1, 2))
+        self.assertEqual(reversed_layout.position(2), (0, 0, 9))
+        self.assertEqual(reversed_layout.position(3), (0, 0, 1))
+        self.assertEqual(reversed_layout.position(4), (0, 1, 1))
+
+    def test_extend(self):
+        """Entries added to a displayed layout are placed like a rebuilt layout"""
+        extended = ReversedLayout(build_layout(self.image_counts[:6]))
+        extended.extend(self.image_counts[6:])
+        reference = ReversedLayout(build_layout(self.image_counts))
+        self.assertEqual(extended.height, reference.height)
+        for page in range(reference.page_count()):
+            self.assertEqual(extended.page_range(page), reference.page_range(page))
+        for index in range(len(reference)):
+            self.assertEqual(extended.position(index), reference.position(index))
+
+
+if __name__ == "__main__":
+    main()